@@ -1,4 +1,4 @@
-from captureAgents import CaptureAgent
+from captureAgents import CaptureAgent, TeamContext
 import distanceCalculator
 import random, time, util, sys
 from game import Directions
@@ -27,7 +27,9 @@ def createTeam(firstIndex, secondIndex, isRed,
     any extra arguments, so you should make sure that the default
     behavior is what you want for the nightly contest.
     """
-    return [eval(first)(firstIndex), eval(second)(secondIndex)]
+    agents = [eval(first)(firstIndex), eval(second)(secondIndex)]
+    TeamContext(isRed).addAgents(agents)
+    return agents
 
 
 ##########
@@ -71,17 +73,6 @@ class ReflexCaptureAgent(CaptureAgent):
 
         return random.choice(bestActions)
 
-    def getSuccessor(self, gameState, action):
-        """
-        Finds the next successor which is a grid position (location tuple).
-        """
-        successor = gameState.generateSuccessor(self.index, action)
-        pos = successor.getAgentState(self.index).getPosition()
-        if pos != nearestPoint(pos):
-            return successor.generateSuccessor(self.index, action)
-        else:
-            return successor
-
     def evaluate(self, gameState, action):
         """
         Computes a linear combination of features and feature weights
@@ -118,17 +109,6 @@ class OffensiveReflexAgent(ReflexCaptureAgent):
         self.start = gameState.getAgentPosition(self.index)
         CaptureAgent.registerInitialState(self, gameState)
 
-    def getSuccessor(self, gameState, action):
-        """
-        Finds the next successor which is a grid position (location tuple).
-        """
-        successor = gameState.generateSuccessor(self.index, action)
-        pos = successor.getAgentState(self.index).getPosition()
-        if pos != nearestPoint(pos):
-            return successor.generateSuccessor(self.index, action)
-        else:
-            return successor
-
     def evaluate(self, gameState, action):
         """
         Computes a linear combination of features and feature weights
@@ -177,18 +157,7 @@ class OffensiveReflexAgent(ReflexCaptureAgent):
                 features['real_danger_distance'] = 1
 
         # 하프라인을 리스트로 받는다
-        halfline = []
-        if self.red:
-            # 좌표가 0부터 시작하기 때문에, red팀이라면 전체 폭의 절반에서 1을 뺀것이 하프라인이다.
-            halfline_x = gameState.data.layout.width // 2 - 1
-        else:
-            halfline_x = gameState.data.layout.width // 2
-        # 벽이 아닌 부분만을 찾아내서 하프라인 리스트에 추가한다.
-        for i in range(gameState.data.layout.height):
-            if gameState.data.layout.walls[halfline_x][i]:
-                pass
-            else:
-                halfline.append(((halfline_x), i))
+        halfline = self.teamContext.getHomeBoundary(gameState)
         # 현재 위치와 가장 가까운 하프라인의 거리를 goinghomeDistance로 둔다.
         tmp = []
         for i in halfline:
@@ -0,0 +1,330 @@
+# approximateQTeam.py
+# -------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Approximate Q-learning on top of the reflex agents' features.
+
+Q(s, a) = w . f(s, a), where f is the getFeatures of a ReflexCaptureAgent
+and w starts from its hand-written getWeights.  Transitions are collected
+while playing and the weights are fitted in batches of TD updates with
+NumPy.  Learned weights are saved to <weightsDir>/<team name>-<agent
+class>.json (weightsDir defaults to weights/ next to this file, which git
+ignores) and loaded by later games.
+
+Learn during the first training games of a capture.py run:
+
+  python capture.py -r approximateQTeam -x 20 -n 25 -q
+
+or collect experience from many games in parallel worker processes:
+
+  python approximateQTeam.py -n 200 -w 4 -b baseline
+"""
+
+from captureAgents import CaptureAgent, TeamContext
+from baseline import ReflexCaptureAgent, OffensiveReflexAgent, DefensiveReflexAgent
+import os, random, sys, time
+import util
+
+#################
+# Team creation #
+#################
+
+def createTeam(firstIndex, secondIndex, isRed,
+               first = 'OffensiveQAgent', second = 'DefensiveQAgent',
+               numTraining = 0, teamName = 'approximateQ', weightsDir = None):
+  """
+  numTraining is the number of games (passed by capture.py's -x option)
+  during which the agents explore and learn; the weights are saved after
+  the last of them, in weightsDir (e.g. --redOpts weightsDir=/tmp/weights).
+  """
+  agents = [eval(first)(firstIndex, int(numTraining), teamName, weightsDir),
+            eval(second)(secondIndex, int(numTraining), teamName, weightsDir)]
+  TeamContext(isRed).addAgents(agents)
+  return agents
+
+#############
+# Q-values  #
+#############
+
+def padColumns(matrix, width):
+  import numpy
+  if matrix.shape[1] == width: return matrix
+  return numpy.hstack([matrix, numpy.zeros((matrix.shape[0], width - matrix.shape[1]))])
+
+def tdUpdate(weights, transitions, schema, alpha, discount):
+  """
+  One batch of Q-learning updates.  transitions is a list of
+  (features, reward, nextFeatures) where features is the feature Counter of
+  the action taken and nextFeatures the list of feature Counters of the
+  actions available afterwards (None at the end of the game).  Returns the
+  new weights as a dictionary.
+
+  All Q-values of the batch are computed with two matrix-vector products.
+  The step is the average over the batch of each transition's TD error
+  times its features, normalized by 1 + |f|^2 so that features of any scale
+  (distances next to 0/1 flags) do not make the weights diverge.
+  """
+  import numpy
+  features = schema.matrix([t[0] for t in transitions])
+  rewards = numpy.array([t[1] for t in transitions], dtype=float)
+  nextCounters = []
+  starts = []
+  for t in transitions:
+    if t[2]:
+      starts.append(len(nextCounters))
+      nextCounters.extend(t[2])
+  nextFeatures = schema.matrix(nextCounters)
+  w = schema.vector(weights)
+
+  width = len(schema)
+  features = padColumns(features, width)
+  nextFeatures = padColumns(nextFeatures, width)
+
+  # Best next Q-value of every non-terminal transition, via reduceat over
+  # the contiguous blocks of next actions
+  nextMax = numpy.zeros(len(transitions))
+  if nextCounters:
+    blockMax = numpy.maximum.reduceat(nextFeatures.dot(w), starts)
+    nonTerminal = numpy.array([bool(t[2]) for t in transitions])
+    nextMax[nonTerminal] = blockMax
+
+  errors = rewards + discount * nextMax - features.dot(w)
+  norms = 1.0 + (features * features).sum(axis=1)
+  w = w + alpha * features.T.dot(errors / norms) / len(transitions)
+  return dict(zip(schema.names, [float(v) for v in w]))
+
+##########
+# Agents #
+##########
+
+class ApproximateQAgent(ReflexCaptureAgent):
+  """
+  Mix in with a ReflexCaptureAgent that defines getFeatures and getWeights;
+  getWeights gives the initial weights.
+  """
+  alpha = 0.2
+  discount = 0.9
+  epsilon = 0.1
+  batchSize = 128
+
+  # The learned weights are the same for every state and action, so
+  # evaluateActions scores all the actions with one matrix-vector product
+  staticWeights = True
+  evaluate = CaptureAgent.evaluate
+
+  def __init__(self, index, numTraining = 0, teamName = 'approximateQ', weightsDir = None):
+    ReflexCaptureAgent.__init__(self, index)
+    self.numTraining = numTraining
+    self.teamName = teamName
+    if weightsDir is None:
+      weightsDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weights')
+    self.weightsDir = weightsDir
+    self.episodes = 0
+    # With collectOnly the agent explores and keeps its transitions for a
+    # trainer in another process instead of learning from them
+    self.collectOnly = False
+    self.transitions = []
+    self.lastState = None
+    self.lastFeatures = None
+    self.learnedWeights = self.loadWeights()
+    if self.learnedWeights is None:
+      # The hand-written weights of the reflex agent this is mixed into
+      self.learnedWeights = dict(super(ApproximateQAgent, self).getWeights(None, None))
+
+  def weightsPath(self):
+    return os.path.join(self.weightsDir, '%s-%s.json' % (self.teamName, self.__class__.__name__))
+
+  def loadWeights(self):
+    import json
+    try:
+      with open(self.weightsPath()) as f:
+        return json.load(f)['weights']
+    except (IOError, OSError, ValueError, KeyError):
+      return None
+
+  def saveWeights(self):
+    import json
+    path = self.weightsPath()
+    if not os.path.isdir(os.path.dirname(path)): os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+      json.dump({'weights': self.learnedWeights, 'episodes': self.episodes}, f, indent=2, sort_keys=True)
+
+  def getFeatures(self, gameState, action):
+    # The bias absorbs the offset between the hand-written weights' scores
+    # and actual Q-values, which would otherwise be fitted by the features
+    features = super(ApproximateQAgent, self).getFeatures(gameState, action)
+    features['bias'] = 1.0
+    return features
+
+  def getWeights(self, gameState, action):
+    return self.learnedWeights
+
+  def isLearning(self):
+    return self.collectOnly or self.episodes < self.numTraining
+
+  def getReward(self, previous, current):
+    """
+    The score change for this team, plus a little for picking up food and a
+    penalty for being sent back to the start.
+    """
+    reward = self.getScore(current) - self.getScore(previous)
+    before, after = previous.getAgentState(self.index), current.getAgentState(self.index)
+    reward += 0.1 * (after.numCarrying - before.numCarrying)
+    if current.getAgentPosition(self.index) == self.start and \
+       self.getMazeDistance(previous.getAgentPosition(self.index), self.start) > 1:
+      reward -= 1
+    return reward
+
+  def chooseAction(self, gameState):
+    import numpy
+    actions = gameState.getLegalActions(self.index)
+    counters = [self.getFeatures(gameState, a) for a in actions]
+    values = self.evaluateActions(gameState, actions, counters)
+
+    if self.isLearning():
+      if self.lastFeatures is not None:
+        self.transitions.append((self.lastFeatures, self.getReward(self.lastState, gameState), counters))
+      if not self.collectOnly and len(self.transitions) >= self.batchSize:
+        self.learn()
+
+    if self.isLearning() and random.random() < self.epsilon:
+      choice = random.randrange(len(actions))
+    else:
+      best = numpy.flatnonzero(values == values.max())
+      choice = random.choice(list(best))
+    self.lastState = gameState
+    self.lastFeatures = counters[choice]
+    return actions[choice]
+
+  def learn(self):
+    self.learnedWeights = tdUpdate(self.learnedWeights, self.transitions, self.getFeatureSchema(),
+                                   self.alpha, self.discount)
+    self.transitions = []
+
+  def final(self, gameState):
+    if self.isLearning() and self.lastFeatures is not None:
+      self.transitions.append((self.lastFeatures, self.getReward(self.lastState, gameState), None))
+    if not self.collectOnly and self.isLearning():
+      if self.transitions: self.learn()
+      self.episodes += 1
+      if self.episodes == self.numTraining:
+        self.saveWeights()
+    self.lastState = None
+    self.lastFeatures = None
+    ReflexCaptureAgent.final(self, gameState)
+
+class OffensiveQAgent(ApproximateQAgent, OffensiveReflexAgent):
+  pass
+
+class DefensiveQAgent(ApproximateQAgent, DefensiveReflexAgent):
+  pass
+
+############################
+# Parallel experience      #
+############################
+
+def collectGame(job):
+  """
+  Plays one game in collection mode and returns ({class name: transitions},
+  score).  Runs in a worker process.
+  """
+  import capture, textDisplay, layout
+  seed, layoutName, weights, opponent, length, teamName = job
+  random.seed(seed)
+  if layoutName.startswith('RANDOM'):
+    seedText = layoutName[6:] or str(seed)
+    l = layout.Layout(capture.randomLayout(int(seedText)).split('\n'))
+  else:
+    l = layout.getLayout(layoutName)
+  util.mutePrint()
+  try:
+    red = createTeam(0, 2, True, teamName=teamName)
+    for agent in red:
+      agent.collectOnly = True
+      agent.learnedWeights = dict(weights[agent.__class__.__name__])
+    blue = capture.loadAgents(False, opponent, True, {})
+    agents = [red[0], blue[0], red[1], blue[1]]
+    rules = capture.CaptureRules(quiet=True)
+    game = rules.newGame(l, agents, textDisplay.NullGraphics(), length, True, False)
+    game.run()
+  finally:
+    util.unmutePrint()
+  transitions = {}
+  for agent in red:
+    transitions.setdefault(agent.__class__.__name__, []).extend(agent.transitions)
+  return transitions, game.state.data.score
+
+def train(numGames, numWorkers, opponent, layoutName, length, gamesPerRound, epochs, teamName, weightsDir=None):
+  """
+  Plays numGames games against opponent in rounds of gamesPerRound games
+  spread over numWorkers processes, fitting the weights on each round's
+  transitions and saving them after every round.
+  """
+  import multiprocessing
+  learners = createTeam(0, 2, True, teamName=teamName, weightsDir=weightsDir)
+  weights = dict([(agent.__class__.__name__, agent.learnedWeights) for agent in learners])
+  pool = multiprocessing.Pool(numWorkers)
+  try:
+    played = 0
+    while played < numGames:
+      count = min(gamesPerRound, numGames - played)
+      start = time.perf_counter()
+      jobs = [(played + i, layoutName, weights, opponent, length, teamName) for i in range(count)]
+      results = pool.map(collectGame, jobs)
+      played += count
+      numTransitions = 0
+      for agent in learners:
+        name = agent.__class__.__name__
+        transitions = sum([r[0].get(name, []) for r in results], [])
+        numTransitions += len(transitions)
+        for epoch in range(epochs):
+          for i in range(0, len(transitions), agent.batchSize):
+            agent.learnedWeights = tdUpdate(agent.learnedWeights, transitions[i:i + agent.batchSize],
+                                            agent.getFeatureSchema(), agent.alpha, agent.discount)
+        agent.episodes += count
+        agent.saveWeights()
+        weights[name] = agent.learnedWeights
+      scores = [r[1] for r in results]
+      print('%d games: average score %.2f, %d transitions, %.1fs' %
+            (played, sum(scores) / float(len(scores)), numTransitions, time.perf_counter() - start))
+  finally:
+    pool.close()
+    pool.join()
+  for agent in learners:
+    print('%s weights saved to %s' % (agent.__class__.__name__, agent.weightsPath()))
+
+def readCommand(argv):
+  from optparse import OptionParser
+  parser = OptionParser('USAGE: python approximateQTeam.py [options]')
+  parser.add_option('-n', '--numGames', type='int', default=40, help='Games to collect [Default: %default]')
+  parser.add_option('-w', '--workers', type='int', default=None, help='Worker processes [Default: CPU count]')
+  parser.add_option('-b', '--blue', default='baseline', help='Opponent team [Default: %default]')
+  parser.add_option('-l', '--layout', default='RANDOM',
+                    help='Layout, RANDOM<seed>, or RANDOM for a new maze every game [Default: %default]')
+  parser.add_option('-i', '--time', type='int', default=1200, help='Moves per game [Default: %default]')
+  parser.add_option('-g', '--gamesPerRound', type='int', default=8, help='Games between weight updates [Default: %default]')
+  parser.add_option('-e', '--epochs', type='int', default=1, help='Passes over each round\'s transitions [Default: %default]')
+  parser.add_option('-t', '--teamName', default='approximateQ', help='Name the weights are saved under [Default: %default]')
+  parser.add_option('-d', '--weightsDir', default=None, help='Directory of the weight files [Default: weights/ next to this file]')
+  options, args = parser.parse_args(argv)
+  if args: parser.error('unexpected arguments: ' + ' '.join(args))
+  if options.workers is None:
+    import multiprocessing
+    options.workers = multiprocessing.cpu_count()
+  return options
+
+if __name__ == '__main__':
+  options = readCommand(sys.argv[1:])
+  train(options.numGames, options.workers, options.blue, options.layout, options.time,
+        options.gamesPerRound, options.epochs, options.teamName, options.weightsDir)
@@ -20,7 +20,7 @@
 # John DeNero (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
 # For more info, see http://inst.eecs.berkeley.edu/~cs188/sp09/pacman.html
 
-from captureAgents import CaptureAgent
+from captureAgents import CaptureAgent, TeamContext
 import distanceCalculator
 import random, time, util, sys
 from game import Directions
@@ -47,7 +47,9 @@ def createTeam(firstIndex, secondIndex, isRed,
   any extra arguments, so you should make sure that the default
   behavior is what you want for the nightly contest.
   """
-  return [eval(first)(firstIndex), eval(second)(secondIndex)]
+  agents = [eval(first)(firstIndex), eval(second)(secondIndex)]
+  TeamContext(isRed).addAgents(agents)
+  return agents
 
 ##########
 # Agents #
@@ -91,18 +93,6 @@ class ReflexCaptureAgent(CaptureAgent):
 
     return random.choice(bestActions)
 
-  def getSuccessor(self, gameState, action):
-    """
-    Finds the next successor which is a grid position (location tuple).
-    """
-    successor = gameState.generateSuccessor(self.index, action)
-    pos = successor.getAgentState(self.index).getPosition()
-    if pos != nearestPoint(pos):
-      # Only half a grid position was covered
-      return successor.generateSuccessor(self.index, action)
-    else:
-      return successor
-
   def evaluate(self, gameState, action):
     """
     Computes a linear combination of features and feature weights
@@ -0,0 +1,212 @@
+# beliefTracker.py
+# ----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Beliefs about where the opponents are, for partially observable games
+(python capture.py --partial-observability).
+
+A tracker follows one opponent.  Create it in registerInitialState and call
+update once per move, before choosing an action:
+
+  def registerInitialState(self, gameState):
+    CaptureAgent.registerInitialState(self, gameState)
+    self.trackers = [ExactBeliefTracker(self, gameState, opponent)
+                     for opponent in self.getOpponents(gameState)]
+
+  def chooseAction(self, gameState):
+    for tracker in self.trackers: tracker.update(gameState)
+    guesses = [tracker.mostLikelyPosition() for tracker in self.trackers]
+
+update assumes the opponent made one move since the previous update, which
+holds for the usual 2 vs 2 turn order.  Opponents are assumed to pick
+uniformly among their legal moves (including stopping).  An observation
+rules out the cells inside the team's sight range (the opponent would have
+been seen), the cells on the wrong side of the board (the opponent's
+isPacman flag is always visible) and the cells that disagree with the noisy
+distance.  If no cell is left, which happens after the opponent is eaten,
+the belief restarts from the cells consistent with the observation.
+
+ExactBeliefTracker keeps a probability per open cell, ParticleBeliefTracker
+a fixed number of samples.  Both are NumPy arrays indexed by open cell, so
+an update costs a few array operations.
+"""
+
+import numpy
+from capture import SONAR_NOISE_RANGE, SIGHT_RANGE
+
+# Per-layout tables shared by all trackers: fingerprint -> MazeCells
+mazeCellsCache = {}
+
+class MazeCells:
+  """
+  The open cells of a layout, numbered 0..n-1, with their coordinates and
+  the cells reachable in one move (including staying put).
+  """
+  def __init__(self, layout):
+    walls = layout.walls
+    self.cells = walls.asList(False)
+    self.indices = dict([(cell, i) for i, cell in enumerate(self.cells)])
+    self.width = layout.width
+    self.xs = numpy.array([x for x, y in self.cells])
+    self.ys = numpy.array([y for x, y in self.cells])
+
+    # moves[i, k] is the k-th cell reachable from cell i, padded with i
+    moves = []
+    for x, y in self.cells:
+      reachable = [self.indices[(x, y)]]
+      for n in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
+        if n in self.indices: reachable.append(self.indices[n])
+      moves.append(reachable)
+    self.numMoves = numpy.array([len(m) for m in moves])
+    self.moves = numpy.array([m + [m[0]] * (5 - len(m)) for m in moves])
+
+    # The same as flat arrays: probability mass moves from sources to targets
+    mask = numpy.arange(5)[None, :] < self.numMoves[:, None]
+    self.sources = numpy.nonzero(mask)[0]
+    self.targets = self.moves[mask]
+    self.moveProbs = 1.0 / self.numMoves[self.sources]
+
+def getMazeCells(layout):
+  fingerprint = layout.getFingerprint()
+  if fingerprint not in mazeCellsCache:
+    mazeCellsCache[fingerprint] = MazeCells(layout)
+  return mazeCellsCache[fingerprint]
+
+class BeliefTracker:
+  """
+  Common part of the trackers: the observation model.
+  """
+  def __init__(self, agent, gameState, opponentIndex):
+    self.agent = agent
+    self.opponentIndex = opponentIndex
+    self.maze = getMazeCells(gameState.data.layout)
+    self.start = self.maze.indices[gameState.getInitialAgentPosition(opponentIndex)]
+    # Cells on the opponent's own side, where it is a ghost
+    onRedSide = self.maze.xs < self.maze.width / 2.0
+    if gameState.isOnRedTeam(opponentIndex): self.homeSide = onRedSide
+    else: self.homeSide = ~onRedSide
+    self.updated = False
+    self.reset([self.start])
+
+  def update(self, gameState):
+    """
+    Advances the belief by one opponent move (except on the first call) and
+    conditions it on the observation gameState.
+    """
+    if self.updated: self.elapseTime()
+    self.updated = True
+    self.observe(gameState)
+
+  def likelihood(self, gameState):
+    """
+    The probability of the observation for the opponent at each cell, or
+    None if the opponent's position is known.
+    """
+    if gameState.getAgentPosition(self.opponentIndex) is not None: return None
+    maze = self.maze
+    weights = numpy.ones(len(maze.cells))
+
+    opponent = gameState.getAgentState(self.opponentIndex)
+    if opponent.isPacman: weights[self.homeSide] = 0
+    else: weights[~self.homeSide] = 0
+
+    distances = gameState.getAgentDistances()
+    for teammate in self.agent.getTeam(gameState):
+      x, y = gameState.getAgentPosition(teammate)
+      manhattan = numpy.abs(maze.xs - x) + numpy.abs(maze.ys - y)
+      weights[manhattan <= SIGHT_RANGE] = 0
+      if teammate == self.agent.index and distances:
+        noise = numpy.abs(manhattan - distances[self.opponentIndex])
+        weights[noise > (SONAR_NOISE_RANGE - 1) // 2] = 0
+    return weights
+
+  def observe(self, gameState):
+    position = gameState.getAgentPosition(self.opponentIndex)
+    if position is not None:
+      self.reset([self.maze.indices[position]])
+      return
+    weights = self.likelihood(gameState)
+    if not self.condition(weights):
+      consistent = numpy.flatnonzero(weights)
+      if len(consistent) == 0: consistent = [self.start]
+      self.reset(consistent)
+
+  def asCounter(self):
+    """
+    The belief as a Counter from position to probability, e.g. for
+    debugDraw.
+    """
+    import util
+    counter = util.Counter()
+    distribution = self.getDistribution()
+    for i in numpy.flatnonzero(distribution):
+      counter[self.maze.cells[i]] = float(distribution[i])
+    return counter
+
+  def mostLikelyPosition(self):
+    return self.maze.cells[int(numpy.argmax(self.getDistribution()))]
+
+class ExactBeliefTracker(BeliefTracker):
+  """
+  Exact inference: the probability of every open cell.
+  """
+  def reset(self, cells):
+    self.belief = numpy.zeros(len(self.maze.cells))
+    self.belief[cells] = 1.0 / len(cells)
+
+  def elapseTime(self):
+    maze = self.maze
+    self.belief = numpy.bincount(maze.targets, weights=self.belief[maze.sources] * maze.moveProbs,
+                                 minlength=len(maze.cells))
+
+  def condition(self, weights):
+    belief = self.belief * weights
+    total = belief.sum()
+    if total <= 0: return False
+    self.belief = belief / total
+    return True
+
+  def getDistribution(self):
+    return self.belief
+
+class ParticleBeliefTracker(BeliefTracker):
+  """
+  A particle filter: numParticles cell indices, resampled after every
+  observation.  Uses its own random generator, so it does not change the
+  game's random sequence.
+  """
+  numParticles = 300
+
+  def __init__(self, agent, gameState, opponentIndex, seed=None):
+    if seed is None: seed = agent.index * 4 + opponentIndex
+    self.rng = numpy.random.default_rng(seed)
+    BeliefTracker.__init__(self, agent, gameState, opponentIndex)
+
+  def reset(self, cells):
+    self.particles = numpy.asarray(cells)[self.rng.integers(len(cells), size=self.numParticles)]
+
+  def elapseTime(self):
+    maze = self.maze
+    choices = (self.rng.random(self.numParticles) * maze.numMoves[self.particles]).astype(int)
+    self.particles = maze.moves[self.particles, choices]
+
+  def condition(self, weights):
+    particleWeights = weights[self.particles]
+    total = particleWeights.sum()
+    if total <= 0: return False
+    self.particles = self.rng.choice(self.particles, size=self.numParticles, p=particleWeights / total)
+    return True
+
+  def getDistribution(self):
+    return numpy.bincount(self.particles, minlength=len(self.maze.cells)) / float(self.numParticles)
@@ -0,0 +1,252 @@
+# benchmarks.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Performance benchmarks for the capture engine.
+
+  python benchmarks.py games [-r RED] [-b BLUE] [-l LAYOUT] [-n GAMES]
+      Games per second with the full Game.run loop and with the headless
+      fast path, checking that both produce the same games.
+
+  python benchmarks.py rollouts [-l LAYOUT] [-n ROLLOUTS]
+      Random rollouts per second with GameState.generateSuccessor and with
+      the in-place GameState.advance (checking both reach the same states),
+      and the iterations per second of MCTSCaptureAgent.  The layout
+      defaults to defaultCapture, or a fixed random maze if it is missing.
+
+  python benchmarks.py startup [-n RUNS]
+      Import time of the startup-critical modules (capture, game, util,
+      layout), measured with python -X importtime in fresh interpreters,
+      and the heaviest modules each one pulls in.
+
+  python benchmarks.py scaling [-r TEAM] [-i MOVES] [--sizes 32x16,64x32,...]
+      For boards of growing size (by default 32x16 to 256x128, not counting
+      the border): the time to generate and parse the maze, the startup
+      time of TEAM's agents (registerInitialState, without the disk cache),
+      the engine's time per move in a fixed-seed game of random agents, and
+      the peak memory of all that (measured in a second, traced pass).
+"""
+
+import sys, time, random
+import util
+
+def playGame(layout, agents, seed, length, fastPath):
+  """
+  Plays one quiet game with the given seed and returns (score, moveHistory).
+  """
+  import capture, textDisplay
+  random.seed(seed)
+  rules = capture.CaptureRules(quiet=True)
+  game = rules.newGame(layout, agents, textDisplay.NullGraphics(), length, True, False)
+  game.allowFastPath = fastPath
+  game.run()
+  return game.state.data.score, game.moveHistory
+
+def benchmarkGames(red, blue, layoutName, numGames, length=1200):
+  import capture
+  l = loadLayout(layoutName)
+  seeds = list(range(numGames))
+  results = {}
+  for fastPath in [False, True]:
+    util.mutePrint()
+    try:
+      redAgents = capture.loadAgents(True, red, True, {})
+      blueAgents = capture.loadAgents(False, blue, True, {})
+      agents = sum([list(el) for el in zip(redAgents, blueAgents)], [])
+      start = time.perf_counter()
+      outcomes = [playGame(l, agents, seed, length, fastPath) for seed in seeds]
+      elapsed = time.perf_counter() - start
+    finally:
+      util.unmutePrint()
+    results[fastPath] = outcomes
+    print('%-10s %6.3f games/s  (%d games in %.2fs)' % (['full', 'headless'][fastPath], numGames / elapsed, numGames, elapsed))
+  if results[False] != results[True]:
+    print('WARNING: the full and headless loops produced different games')
+  else:
+    print('Both loops produced identical games')
+
+def rolloutEnd(state):
+  data = state.data
+  return ([a.configuration.pos for a in data.agentStates], data.score, data.food.count(), data.capsules)
+
+def benchmarkRollouts(layoutName, numRollouts, depth=20, seed=0):
+  import capture, layout, searchAgents
+  from game import Directions
+  l = layout.getLayout(layoutName)
+  if l == None:
+    print('Layout %s not found, using RANDOM%d instead' % (layoutName, seed))
+    l = loadLayout('RANDOM%d' % seed)
+  initState = capture.GameState()
+  initState.initialize(l, 4)
+  initState.data.timeleft = 1200
+
+  results = {}
+  for fastPath in [False, True]:
+    rng = random.Random(seed)
+    ends = []
+    plies = 0
+    start = time.perf_counter()
+    for r in range(numRollouts):
+      state = initState
+      if fastPath: state = capture.GameState(initState)
+      agentIndex = 0
+      for ply in range(depth):
+        if state.isOver(): break
+        actions = state.getLegalActions(agentIndex)
+        actions.remove(Directions.STOP)
+        action = rng.choice(actions)
+        if fastPath: state.advance(agentIndex, action)
+        else: state = state.generateSuccessor(agentIndex, action)
+        agentIndex = (agentIndex + 1) % 4
+        plies += 1
+      ends.append(rolloutEnd(state))
+    elapsed = time.perf_counter() - start
+    results[fastPath] = ends
+    print('%-18s %8.0f rollouts/s %9.0f plies/s' % (['generateSuccessor', 'advance'][fastPath],
+                                                    numRollouts / elapsed, plies / elapsed))
+  if results[False] != results[True]:
+    print('WARNING: generateSuccessor and advance reached different states')
+  else:
+    print('Both paths reached identical states')
+
+  agent = searchAgents.MCTSCaptureAgent(0)
+  agent.registerInitialState(initState)
+  agent.rolloutDepth = depth
+  start = time.perf_counter()
+  agent.chooseAction(initState)
+  elapsed = time.perf_counter() - start
+  print('%-18s %8.0f iterations/s (%d iterations, %d tree nodes)' % ('MCTSCaptureAgent', agent.iterations / elapsed,
+                                                                    agent.iterations, agent.numNodes))
+
+STARTUP_MODULES = ['capture', 'game', 'util', 'layout']
+
+def importTimes(moduleName):
+  """
+  Imports moduleName in a fresh interpreter with -X importtime and returns
+  a list of (cumulativeMicroseconds, selfMicroseconds, importedModule).
+  """
+  import subprocess, os
+  process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + moduleName],
+                           stderr=subprocess.PIPE, universal_newlines=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+  times = []
+  for line in process.stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line: continue
+    selfTime, cumulative, name = line[len('import time:'):].split('|')
+    times.append((int(cumulative), int(selfTime), name.strip()))
+  return times
+
+def benchmarkStartup(runs, top=5):
+  for moduleName in STARTUP_MODULES:
+    totals = []
+    for run in range(runs):
+      times = importTimes(moduleName)
+      totals.append([t for t in times if t[2] == moduleName][0][0])
+    totals.sort()
+    print('%-8s %7.1f ms (median of %d)' % (moduleName, totals[len(totals) // 2] / 1000.0, runs))
+    heaviest = sorted([t for t in times if t[2] != moduleName], reverse=True)[:top]
+    for cumulative, selfTime, name in heaviest:
+      print('           %7.1f ms  %s' % (cumulative / 1000.0, name))
+
+SCALING_SIZES = [(32, 16), (64, 32), (128, 64), (256, 128)]
+
+def scalingRun(width, height, team, length, seed):
+  """
+  Returns (layout, buildSeconds, startupSeconds, engineSecondsPerMove).
+  """
+  import capture, layout, mazeGenerator, textDisplay
+  from captureAgents import RandomAgent
+  start = time.perf_counter()
+  l = layout.Layout(mazeGenerator.generateMaze(seed, height, width // 2).split('\n'))
+  build = time.perf_counter() - start
+
+  initState = capture.GameState()
+  initState.initialize(l, 4)
+  initState.data.timeleft = length
+  util.mutePrint()
+  try:
+    agents = capture.loadAgents(True, team, True, {}) + capture.loadAgents(False, team, True, {})
+    start = time.perf_counter()
+    for agent in agents:
+      agent.precomputed.cacheDir = None
+      agent.registerInitialState(initState.deepCopy())
+    startup = time.perf_counter() - start
+
+    random.seed(seed)
+    rules = capture.CaptureRules(quiet=True)
+    game = rules.newGame(l, [RandomAgent(i) for i in range(4)], textDisplay.NullGraphics(), length, True, False)
+    start = time.perf_counter()
+    game.run()
+    engine = (time.perf_counter() - start) / max(1, len(game.moveHistory))
+  finally:
+    util.unmutePrint()
+  return l, build, startup, engine
+
+def benchmarkScaling(sizes, team, length, seed=1):
+  import tracemalloc, distanceCalculator, precomputation
+  print('%-9s %-9s %7s %9s %10s %14s %10s' % ('size', 'board', 'cells', 'build s', 'startup s', 'engine us/move', 'peak MB'))
+  for width, height in sizes:
+    l, build, startup, engine = scalingRun(width, height, team, length, seed)
+    # Drop per-layout caches so the traced pass computes everything again
+    distanceCalculator.distanceMap.clear()
+    precomputation.memoryCache.clear()
+    tracemalloc.start()
+    scalingRun(width, height, team, length, seed)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    distanceCalculator.distanceMap.clear()
+    precomputation.memoryCache.clear()
+    print('%-9s %-9s %7d %9.3f %10.3f %14.1f %10.1f' % ('%dx%d' % (width, height), '%dx%d' % (l.width, l.height),
+                                                       len(l.walls.asList(False)), build, startup,
+                                                       engine * 1e6, peak / 1e6))
+
+def loadLayout(layoutName):
+  import layout, capture
+  if layoutName.startswith('RANDOM'):
+    return layout.Layout(capture.randomLayout(int(layoutName[6:])).split('\n'))
+  l = layout.getLayout(layoutName)
+  if l == None: raise Exception("The layout " + layoutName + " cannot be found")
+  return l
+
+def readCommand(argv):
+  from optparse import OptionParser
+  parser = OptionParser(__doc__)
+  parser.add_option('-r', '--red', default='baseline.py', help='Red team [Default: %default]')
+  parser.add_option('-b', '--blue', default='baseline.py', help='Blue team [Default: %default]')
+  parser.add_option('-l', '--layout', default=None,
+                    help='Layout [Default: RANDOM1 for games, defaultCapture for rollouts]')
+  parser.add_option('-n', '--numGames', type='int', default=None, help='Number of games, rollouts or startup runs [Default: 3, 2000 rollouts]')
+  parser.add_option('-i', '--time', type='int', default=1200, help='Moves per game [Default: %default]')
+  parser.add_option('--sizes', default=None,
+                    help='Board sizes for scaling, e.g. 32x16,64x32 [Default: 32x16 to 256x128]')
+  options, args = parser.parse_args(argv)
+  if len(args) != 1: parser.error('expected a benchmark name')
+  return args[0], options
+
+if __name__ == '__main__':
+  name, options = readCommand(sys.argv[1:])
+  if name == 'games':
+    benchmarkGames(options.red, options.blue, options.layout or 'RANDOM1', options.numGames or 3, options.time)
+  elif name == 'rollouts':
+    benchmarkRollouts(options.layout or 'defaultCapture', options.numGames or 2000)
+  elif name == 'startup':
+    benchmarkStartup(options.numGames or 3)
+  elif name == 'scaling':
+    sizes = SCALING_SIZES
+    if options.sizes:
+      sizes = [tuple([int(n) for n in size.split('x')]) for size in options.sizes.split(',')]
+    benchmarkScaling(sizes, options.red, options.time)
+  else:
+    print('Unknown benchmark: ' + name)
+    sys.exit(1)
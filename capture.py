@@ -58,17 +58,24 @@ from game import Grid
 from game import Configuration
 from game import Agent
 from game import reconstituteGrid
-import sys, util, types, time, random, imp
-import keyboardAgents
+import sys, util, types, time, random
+import timingReport
+import gameResults
+import gameRecord
 
-import pandas as pd
+# Heavy or rarely needed modules (pandas, imp, keyboardAgents and the
+# graphics) are imported where they are used, to keep startup fast.
 # If you change these, you won't affect the server, so you can't cheat
 KILL_POINTS = 0
-# ***BEGIN REMOVED FOR CONTEST 2***
+# With partial observability (--partial-observability) agents only see
+# opponents within SIGHT_RANGE of a teammate and get a noisy distance to
+# every agent
+PARTIAL_OBSERVABILITY = False
+# Pre-generated random mazes (mazeGenerator.MazeCorpus), set by --maze-corpus
+MAZE_CORPUS = None
 SONAR_NOISE_RANGE = 13 # Must be odd
-SONAR_NOISE_VALUES = [i - (SONAR_NOISE_RANGE - 1)/2 for i in range(SONAR_NOISE_RANGE)]
+SONAR_NOISE_VALUES = [i - (SONAR_NOISE_RANGE - 1)//2 for i in range(SONAR_NOISE_RANGE)]
 SIGHT_RANGE = 5 # Manhattan distance
-# ***END REMOVED FOR CONTEST 2***
 MIN_FOOD = 2
 TOTAL_FOOD = 60
 
@@ -77,10 +84,8 @@ DUMP_FOOD_ON_DEATH = True # if we have the gameplay element that dumps dots on d
 SCARED_TIME = 40
 CRASH_PENALTY = 100 # the penalty for crashing (due to timeout or exceptions)
 
-# ***BEGIN REMOVED FOR CONTEST 2***
-# def noisyDistance(pos1, pos2):
-#   return int(util.manhattanDistance(pos1, pos2) + random.choice(SONAR_NOISE_VALUES))
-# ***END REMOVED FOR CONTEST 2***
+def noisyDistance(pos1, pos2):
+  return int(util.manhattanDistance(pos1, pos2) + random.choice(SONAR_NOISE_VALUES))
 
 ###################################################
 # YOUR INTERFACE TO THE PACMAN WORLD: A GameState #
@@ -127,6 +132,29 @@ class GameState:
     state.data.timeleft = self.data.timeleft - 1
     return state
 
+  def advance( self, agentIndex, action ):
+    """
+    Applies a legal action to this state in place.  This is the fast path of
+    generateSuccessor for simulations (e.g. rollouts): nothing is copied and
+    the action is not checked, so only use it on a private copy such as
+    GameState(state), never on a state the game or another agent holds.
+    """
+    data = self.data
+    data._foodEaten = None
+    data._foodAdded = None
+    data._capsuleEaten = None
+    data._lose = False
+    data._win = False
+    data.scoreChange = 0
+
+    AgentRules.moveAgent( self, action, agentIndex )
+    AgentRules.checkDeath(self, agentIndex)
+    AgentRules.decrementTimer(data.agentStates[agentIndex])
+
+    data._agentMoved = agentIndex
+    data.score += data.scoreChange
+    data.timeleft -= 1
+
   def getAgentState(self, index):
     return self.data.agentStates[index]
 
@@ -214,21 +242,20 @@ class GameState:
 
   def getAgentDistances(self):
     """
-    Returns a noisy distance to each agent.
+    Returns a noisy distance to each agent, as sensed by the agent the state
+    was observed for (an empty list unless the game is partially observable).
     """
     if 'agentDistances' in dir(self) :
       return self.agentDistances
     else:
       return None
 
-  # ***BEGIN REMOVED FOR CONTEST 2***
-  # def getDistanceProb(self, trueDistance, noisyDistance):
-  #   "Returns the probability of a noisy distance given the true distance"
-  #   if noisyDistance - trueDistance in SONAR_NOISE_VALUES:
-  #     return 1.0/SONAR_NOISE_RANGE
-  #   else:
-  #     return 0
-  # ***END REMOVED FOR CONTEST 2***
+  def getDistanceProb(self, trueDistance, noisyDistance):
+    "Returns the probability of a noisy distance given the true distance"
+    if noisyDistance - trueDistance in SONAR_NOISE_VALUES:
+      return 1.0/SONAR_NOISE_RANGE
+    else:
+      return 0
 
   def getInitialAgentPosition(self, agentIndex):
     "Returns the initial position of an agent."
@@ -274,30 +301,30 @@ class GameState:
 
   def makeObservation(self, index):
     state = self.deepCopy()
-
-    # ***BEGIN REMOVED FOR CONTEST 2***
-    # # Adds the sonar signal
-    # pos = state.getAgentPosition(index)
-    # n = state.getNumAgents()
-    # distances = [noisyDistance(pos, state.getAgentPosition(i)) for i in range(n)]
-    # state.agentDistances = distances
-    #
-    # # Remove states of distant opponents
-    # if index in self.blueTeam:
-    #   team = self.blueTeam
-    #   otherTeam = self.redTeam
-    # else:
-    #   otherTeam = self.blueTeam
-    #   team = self.redTeam
-    #
-    # for enemy in otherTeam:
-    #   seen = False
-    #   enemyPos = state.getAgentPosition(enemy)
-    #   for teammate in team:
-    #     if util.manhattanDistance(enemyPos, state.getAgentPosition(teammate)) <= SIGHT_RANGE:
-    #       seen = True
-    #   if not seen: state.data.agentStates[enemy].configuration = None
-    # ***END REMOVED FOR CONTEST 2***
+    if not PARTIAL_OBSERVABILITY: return state
+
+    # Adds the sonar signal
+    pos = state.getAgentPosition(index)
+    n = state.getNumAgents()
+    distances = [noisyDistance(pos, state.getAgentPosition(i)) for i in range(n)]
+    state.agentDistances = distances
+
+    # Remove states of distant opponents
+    if index in self.blueTeam:
+      team = self.blueTeam
+      otherTeam = self.redTeam
+    else:
+      otherTeam = self.blueTeam
+      team = self.redTeam
+
+    sightRanges = self.data.layout.getSightRanges(SIGHT_RANGE)
+    inSight = [sightRanges[state.getAgentPosition(teammate)] for teammate in team]
+    for enemy in otherTeam:
+      enemyPos = state.getAgentPosition(enemy)
+      seen = False
+      for cells in inSight:
+        if enemyPos in cells: seen = True
+      if not seen: state.data.agentStates[enemy].configuration = None
     return state
 
   def __eq__( self, other ):
@@ -344,9 +371,8 @@ def halfGrid(grid, red):
   if red:    xrange = list(range(halfway))
   else:       xrange = list(range(halfway, grid.width))
 
-  for y in range(grid.height):
-    for x in xrange:
-      if grid[x][y]: halfgrid[x][y] = True
+  for x in xrange:
+    halfgrid.data[x] = [value and True or False for value in grid.data[x]]
 
   return halfgrid
 
@@ -395,9 +421,8 @@ class CaptureRules:
     """
     Checks to see whether it is time to end the game.
     """
-    if 'moveHistory' in dir(game):
-      if len(game.moveHistory) == game.length:
-        state.data._win = True
+    if len(game.moveHistory) == game.length:
+      state.data._win = True
 
     if state.isOver():
       game.gameOver = True
@@ -482,7 +507,14 @@ class AgentRules:
     legal = AgentRules.getLegalActions( state, agentIndex )
     if action not in legal:
       raise Exception("Illegal action " + str(action))
+    AgentRules.moveAgent( state, action, agentIndex )
 
+  applyAction = staticmethod( applyAction )
+
+  def moveAgent( state, action, agentIndex ):
+    """
+    applyAction without the legality check.
+    """
     # Update Configuration
     agentState = state.data.agentStates[agentIndex]
     speed = 1.0
@@ -523,7 +555,7 @@ class AgentRules:
     if agentState.isPacman and manhattanDistance( nearest, next ) <= 0.9 :
       AgentRules.consume( nearest, state, state.isOnRedTeam(agentIndex) )
 
-  applyAction = staticmethod( applyAction )
+  moveAgent = staticmethod( moveAgent )
 
   def consume( position, state, isRed ):
     x,y = position
@@ -759,9 +791,12 @@ def parseAgentArgs(str):
     opts[key] = val
   return opts
 
-def readCommand(argv, blue_team):
+def readCommand(argv, blue_team, registry=None):
   """
   Processes the command used to run pacman from the command line.
+
+  If a TeamRegistry is given, team modules and layouts are taken from (and
+  added to) it instead of being loaded again.
   """
   from optparse import OptionParser
   usageStr = """
@@ -813,12 +848,26 @@ def readCommand(argv, blue_team):
                     help='Fixes the random seed to always play the same game', default=False)
   parser.add_option('--record', action='store_true',
                     help='Writes game histories to a file (named by the time they were played)', default=False)
+  parser.add_option('--record-compression', dest='recordCompression', default='none',
+                    choices=gameRecord.COMPRESSIONS,
+                    help=default('Compression of recorded games (none, gzip or lzma)'))
   parser.add_option('--replay', default=None,
                     help='Replays a recorded game file.')
+  parser.add_option('--fast-replay', action='store_true', dest='fastReplay', default=False,
+                    help='With --replay, re-simulates the game without a display and reports the replay speed')
   parser.add_option('-x', '--numTraining', dest='numTraining', type='int',
                     help=default('How many episodes are training (suppresses output)'), default=0)
   parser.add_option('-c', '--catchExceptions', action='store_true', default=False,
                     help='Catch exceptions and enforce time limits')
+  parser.add_option('--results', default=None,
+                    help='Appends one record per finished game to this file (CSV if it ends in .csv, JSON lines otherwise)')
+  parser.add_option('--maze-corpus', dest='mazeCorpus', default=None,
+                    help='Directory of mazes made with mazeGenerator.py --corpus; RANDOM layouts are drawn from it')
+  parser.add_option('--partial-observability', action='store_true', dest='partialObservability', default=False,
+                    help='Agents only see opponents near their team and get noisy distances to the others '
+                         '(only for agents that track beliefs, see beliefTracker.py)')
+  parser.add_option('--profile-features', action='store_true', dest='profileFeatures', default=False,
+                    help='Times every feature of the agents\' getFeatures and prints a report after each game')
 
   options, otherjunk = parser.parse_args(argv)
   assert len(otherjunk) == 0, "Unrecognized options: " + str(otherjunk)
@@ -853,10 +902,19 @@ def readCommand(argv, blue_team):
   if options.fixRandomSeed: random.seed('cs188')
 
   # Special case: recorded games don't use the runGames method or args structure
+  if options.replay != None and options.fastReplay:
+    import fastReplay
+    replay = fastReplay.FastReplay.fromRecord(options.replay)
+    movesPerSecond = replay.build()
+    print('Replayed %d moves at %.0f moves/s, final score %d' % (replay.numMoves(), movesPerSecond, replay.finalState.getScore()))
+    sys.exit(0)
   if options.replay != None:
     print('Replaying recorded game %s.' % options.replay)
-    import pickle
-    recorded = pickle.load(open(options.replay, 'rb'))
+    if gameRecord.isRecordFile(options.replay):
+      recorded = gameRecord.loadReplay(options.replay)
+    else:
+      import pickle
+      recorded = pickle.load(open(options.replay, 'rb'))
     recorded['display'] = args['display']
     replayGame(**recorded)
     sys.exit(0)
@@ -868,14 +926,15 @@ def readCommand(argv, blue_team):
     blueArgs['numTraining'] = options.numTraining
   nokeyboard = options.textgraphics or options.quiet or options.numTraining > 0
   print('\nRed team %s with %s:' % (options.red, redArgs))
-  redAgents = loadAgents(True, options.red, nokeyboard, redArgs)
+  redAgents = loadAgents(True, options.red, nokeyboard, redArgs, registry)
   print('\nBlue team %s with %s:' % (options.blue, blueArgs))
-  blueAgents = loadAgents(False, options.blue, nokeyboard, blueArgs)
+  blueAgents = loadAgents(False, options.blue, nokeyboard, blueArgs, registry)
   args['agents'] = sum([list(el) for el in zip(redAgents, blueAgents)],[]) # list of agents
 
   numKeyboardAgents = 0
   for index, val in enumerate([options.keys0, options.keys1, options.keys2, options.keys3]):
     if not val: continue
+    import keyboardAgents
     if numKeyboardAgents == 0:
       agent = keyboardAgents.KeyboardAgent(index)
     elif numKeyboardAgents == 1:
@@ -887,12 +946,24 @@ def readCommand(argv, blue_team):
 
   # Choose a layout
   import layout
+  if options.mazeCorpus:
+    import mazeGenerator
+    global MAZE_CORPUS
+    MAZE_CORPUS = mazeGenerator.MazeCorpus(options.mazeCorpus)
+    if len(MAZE_CORPUS) == 0: raise Exception('The maze corpus %s is empty' % options.mazeCorpus)
   layouts = []
+  layoutNames = []
   for i in range(options.numGames):
+    layoutName = options.layout
     if options.layout == 'RANDOM':
-      l = layout.Layout(randomLayout().split('\n'))
+      if MAZE_CORPUS is not None: seed = random.choice(MAZE_CORPUS.seeds)
+      else: seed = random.randint(0,99999999)
+      layoutName = 'RANDOM%d' % seed
+      l = layout.Layout(randomLayout(seed).split('\n'))
+    elif registry is not None:
+      l = registry.getLayout(options.layout)
     elif options.layout.startswith('RANDOM'):
-      l = layout.Layout(randomLayout(int(options.layout[6:])).split('\n'))
+      l = layout.internLayout(randomLayout(int(options.layout[6:])).split('\n'))
     elif options.layout.lower().find('capture') == -1:
       raise Exception( 'You must use a capture layout with capture.py')
     else:
@@ -900,26 +971,46 @@ def readCommand(argv, blue_team):
     if l == None: raise Exception("The layout " + options.layout + " cannot be found")
 
     layouts.append(l)
+    layoutNames.append(layoutName)
 
   args['layouts'] = layouts
+  args['layoutNames'] = layoutNames
   args['length'] = options.time
   args['numGames'] = options.numGames
   args['numTraining'] = options.numTraining
   args['record'] = options.record
+  args['recordCompression'] = options.recordCompression
   args['catchExceptions'] = options.catchExceptions
+  args['timingReport'] = timingReport.TimingReport(options.red, options.blue)
+  args['resultSink'] = gameResults.ResultSink(options.results, options.red, options.blue)
+  if options.partialObservability:
+    global PARTIAL_OBSERVABILITY
+    if not PARTIAL_OBSERVABILITY:
+      # Printed once, not for every matchup
+      print('Warning: with --partial-observability, opponents out of sight have no position (None).')
+      print('Only agents that track beliefs (see beliefTracker.py) support this; the reflex teams')
+      print('in this repository expect to see every opponent and crash.')
+    PARTIAL_OBSERVABILITY = True
+  if options.profileFeatures:
+    import captureAgents
+    captureAgents.CaptureAgent.profileFeatures = True
   return args
 
 def randomLayout(seed = None):
-  if not seed:
+  if seed is None:
     seed = random.randint(0,99999999)
-  # layout = 'layouts/random%08dCapture.lay' % seed
-  # print 'Generating random layout in %s' % layout
+  if MAZE_CORPUS is not None:
+    text = MAZE_CORPUS.getLayoutText(seed)
+    if text is not None: return text
   import mazeGenerator
   return mazeGenerator.generateMaze(seed)
 
-import traceback
-def loadAgents(isRed, factory, textgraphics, cmdLineArgs):
-  "Calls agent factories and returns lists of agents"
+def loadTeamFactory(isRed, factory):
+  """
+  Imports a team file and returns its createTeam function, or None if the
+  team could not be loaded.
+  """
+  import imp, traceback
   try:
     if not factory.endswith(".py"):
       factory += ".py"
@@ -928,10 +1019,33 @@ def loadAgents(isRed, factory, textgraphics, cmdLineArgs):
   except (NameError, ImportError):
     print('Error: The team "' + factory + '" could not be loaded! ', file=sys.stderr)
     traceback.print_exc()
+    return None
+
+  try:
+    return getattr(module, 'createTeam')
+  except AttributeError:
+    print('Error: The team "' + factory + '" could not be loaded! ', file=sys.stderr)
+    traceback.print_exc()
+    return None
+
+def acceptsArgument(function, name):
+  import inspect
+  parameters = inspect.signature(function).parameters
+  return name in parameters or any([p.kind == p.VAR_KEYWORD for p in parameters.values()])
+
+def loadAgents(isRed, factory, textgraphics, cmdLineArgs, registry=None):
+  "Calls agent factories and returns lists of agents"
+  if registry is not None:
+    createTeamFunc = registry.getCreateTeam(isRed, factory)
+  else:
+    createTeamFunc = loadTeamFactory(isRed, factory)
+  if createTeamFunc is None:
     return [None for i in range(2)]
 
   args = dict()
   args.update(cmdLineArgs)  # Add command line args with priority
+  if 'numTraining' in args and not acceptsArgument(createTeamFunc, 'numTraining'):
+    del args['numTraining']   # Only learning teams take part in training
 
   print("Loading Team:", factory)
   print("Arguments:", args)
@@ -939,18 +1053,56 @@ def loadAgents(isRed, factory, textgraphics, cmdLineArgs):
   # if textgraphics and factoryClassName.startswith('Keyboard'):
   #   raise Exception('Using the keyboard requires graphics (no text display, quiet or training games)')
 
-  try:
-    createTeamFunc = getattr(module, 'createTeam')
-  except AttributeError:
-    print('Error: The team "' + factory + '" could not be loaded! ', file=sys.stderr)
-    traceback.print_exc()
-    return [None for i in range(2)]
-
   indexAddend = 0
   if not isRed:
     indexAddend = 1
   indices = [2*i + indexAddend for i in range(2)]
-  return createTeamFunc(indices[0], indices[1], isRed, **args)
+  agents = createTeamFunc(indices[0], indices[1], isRed, **args)
+  for agent in agents:
+    if agent is not None and hasattr(agent, 'registerTeam'):
+      agent.registerTeam(indices)
+  return agents
+
+class TeamRegistry:
+  """
+  Loads each team file (per side) and each named layout once per process.
+  Every call to loadAgents still builds fresh agents from the cached
+  createTeam function.
+  """
+  def __init__(self):
+    self.factories = {}
+    self.importTimes = {}
+    self.layouts = {}
+
+  def getCreateTeam(self, isRed, factory):
+    if not factory.endswith(".py"):
+      factory += ".py"
+    key = (factory, isRed)
+    if key not in self.factories:
+      start = time.perf_counter()
+      self.factories[key] = loadTeamFactory(isRed, factory)
+      self.importTimes[key] = time.perf_counter() - start
+    return self.factories[key]
+
+  def getLayout(self, name):
+    """
+    Parses a named layout (or RANDOM<seed>) the first time it is asked for.
+    """
+    if name not in self.layouts:
+      import layout
+      if name.startswith('RANDOM'):
+        l = layout.internLayout(randomLayout(int(name[6:])).split('\n'))
+      elif name.lower().find('capture') == -1:
+        raise Exception( 'You must use a capture layout with capture.py')
+      else:
+        l = layout.getLayout( name )
+      self.layouts[name] = l
+    return self.layouts[name]
+
+  def printImportTimes(self):
+    print('Team import times:')
+    for (factory, isRed), seconds in sorted(self.importTimes.items()):
+      print('  %-24s %-4s %7.1f ms' % (factory, ['blue', 'red'][isRed], 1000 * seconds))
 
 def replayGame( layout, agents, actions, display, length, redTeamName, blueTeamName ):
     rules = CaptureRules()
@@ -970,10 +1122,14 @@ def replayGame( layout, agents, actions, display, length, redTeamName, blueTeamN
 
     display.finish()
 
-def runGames( layouts, agents, display, length, numGames, record, numTraining, redTeamName, blueTeamName, muteAgents=False, catchExceptions=False ):
-
+def runGames( layouts, agents, display, length, numGames, record, numTraining, redTeamName, blueTeamName, muteAgents=False, catchExceptions=False, timingReport=None, resultSink=None, layoutNames=None, recordCompression='none' ):
+  """
+  Plays numGames games and returns (resultSink, averageScore, redWinRate,
+  blueWinRate).  Each finished game is handed to the result sink (and the
+  timing report) as soon as it ends and is not kept afterwards.
+  """
   rules = CaptureRules()
-  games = []
+  if resultSink is None: resultSink = gameResults.ResultSink()
 
   if numTraining > 0:
     print('Playing %d training games' % numTraining)
@@ -989,35 +1145,53 @@ def runGames( layouts, agents, display, length, numGames, record, numTraining, r
     else:
         gameDisplay = display
         rules.quiet = False
+    # Every game gets its own seed so that it can be reproduced from its record
+    seed = random.randint(0, 2**31 - 1)
+    random.seed(seed)
     g = rules.newGame( layout, agents, gameDisplay, length, muteAgents, catchExceptions )
-    g.run()
-    if not beQuiet: games.append(g)
-
-    g.record = None
     if record:
-      import time, pickle, game
-      #fname = ('recorded-game-%d' % (i + 1)) +  '-'.join([str(t) for t in time.localtime()[1:6]])
-      #f = file(fname, 'w')
-      components = {'layout': layout, 'agents': [game.Agent() for a in agents], 'actions': g.moveHistory, 'length': length, 'redTeamName': redTeamName, 'blueTeamName':blueTeamName }
-      #f.close()
-      print("recorded")
-      g.record = pickle.dumps(components)
-      with open('replay-%d'%i,'wb') as f:
-        f.write(g.record)
-
+      path = gameRecord.uniqueRecordPath('replay', recordCompression)
+      g.recorder = gameRecord.GameRecorder(path, layout, len(agents), g.startingIndex, length,
+                                           seed, redTeamName, blueTeamName, recordCompression)
+    finished = False
+    try:
+      g.run()
+      finished = True
+    finally:
+      # Close the record even if the game raised, without a final score
+      if record:
+        if finished: g.recorder.close(g.state.data.score)
+        else: g.recorder.close()
+    if record: print("recorded %s" % path)
+    if not beQuiet:
+      layoutName = None
+      if layoutNames: layoutName = layoutNames[i]
+      resultSink.addGame(i, g, seed, layoutName)
+    if timingReport is not None: timingReport.addGame(i, g.timings)
+    for agent in agents:
+      profiler = getattr(agent, 'featureProfiler', None)
+      if profiler is not None:
+        print(profiler.report())
+        profiler.reset()
+
+    # Drop the finished game (state, move history, agent output) right away
+    g = None
+
+  resultSink.close()
+  redWinRate = resultSink.redWinRate()
+  redLoseRate = resultSink.blueWinRate()
+  Avg_score = resultSink.averageScore()
   if numGames > 1:
-    scores = [game.state.data.score for game in games]
-    redWinRate = [s > 0 for s in scores].count(True)/ float(len(scores))
-    redLoseRate = [s < 0 for s in scores].count(True)/ float(len(scores))
-    Avg_score = sum(scores) / float(len(scores))
-    print('Average Score:', sum(scores) / float(len(scores)))
+    scores = resultSink.scores
+    print('Average Score:', Avg_score)
     print('Scores:       ', ', '.join([str(score) for score in scores]))
-    print('Red Win Rate:  %d/%d (%.2f)' % ([s > 0 for s in scores].count(True), len(scores), redWinRate))
-    print('Blue Win Rate: %d/%d (%.2f)' % ([s < 0 for s in scores].count(True), len(scores), redLoseRate))
+    print('Red Win Rate:  %d/%d (%.2f)' % (resultSink.redWins, resultSink.numGames, redWinRate))
+    print('Blue Win Rate: %d/%d (%.2f)' % (resultSink.blueWins, resultSink.numGames, redLoseRate))
     print('Record:       ', ', '.join([('Blue', 'Tie', 'Red')[max(0, min(2, 1 + s))] for s in scores]))
-  return games, Avg_score, redWinRate, redLoseRate
+  return resultSink, Avg_score, redWinRate, redLoseRate
 
 def save_score(data, data_2):
+    import pandas as pd
     column_name = ['your_best(red)']
     df_category_1 = pd.DataFrame(data=['<Average Winning Rate>'], columns=column_name, index=[''])
     df_category_2 = pd.DataFrame(data=['<Average Scores>'], columns=column_name, index=[''])
@@ -1052,11 +1226,15 @@ if __name__ == '__main__':
   avg_win_rate = 0.0
   avg_score = 0.0
 
+  timingReports = []
+  registry = TeamRegistry()
+
   lst = ['your_baseline1.py','your_baseline2.py','your_baseline3.py', 'baseline.py']
   for i in range(len(lst)):
-    options = readCommand( sys.argv[1:] ,lst[i]) # Get game components based on input
+    options = readCommand( sys.argv[1:] ,lst[i], registry) # Get game components based on input
+    timingReports.append(options['timingReport'])
 
-    games, Avg_score, redWinRate, redLoseRate = runGames(**options)
+    results, Avg_score, redWinRate, redLoseRate = runGames(**options)
 
     WinRate = redWinRate if redWinRate>redLoseRate else -redLoseRate
     data.append([WinRate])
@@ -1073,3 +1251,5 @@ if __name__ == '__main__':
   data_2.append([avg_score])
 
   save_score(data, data_2)
+  timingReport.saveReports(timingReports, 'timing.json', 'timing.csv')
+  registry.printImportTimes()
@@ -18,8 +18,16 @@
 
 from game import Agent
 import distanceCalculator
+import observationHistory
+import precomputation
 from util import nearestPoint
 import util
+import time
+import random
+
+# Number of CaptureAgents in this process choosing a move right now.  Pondering
+# threads wait while it is nonzero so they never slow down an agent on the clock.
+movesInProgress = 0
 
 # Note: the following class is not used, but is kept for backwards
 # compatibility with team submissions that try to import it.
@@ -51,6 +59,34 @@ class CaptureAgent(Agent):
   Recommended Usage:  Subclass CaptureAgent and override chooseAction.
   """
 
+  # How past observations are stored (see observationHistory.py): 'full'
+  # keeps every GameState, 'ring' only the last historyLength of them and
+  # 'delta' keeps all of them as compact deltas from the latest one.  Set
+  # 'ring' in a subclass to bound the history's memory.
+  historyPolicy = 'full'
+  historyLength = None
+
+  # Feature vectors (see evaluateActions): featureNames optionally fixes the
+  # column order of a class's features up front; staticWeights says that
+  # getWeights returns the same weights for every state and action.
+  featureNames = None
+  staticWeights = False
+
+  # Precomputation (see precomputation.py): seconds of the startup budget
+  # left for the rest of registerInitialState, and whether results are
+  # also cached on disk (in a per-user directory).
+  startupReserve = 2.0
+  precomputeCache = False
+
+  # Pondering (see startPondering): whether to keep thinking in a background
+  # thread between moves, and for at most how many seconds each time.
+  ponder = False
+  ponderTime = 1.0
+
+  # Per-feature profiling of getFeatures (see featureProfiler.py), switched
+  # on for all agents by capture.py --profile-features
+  profileFeatures = False
+
   #############################
   # Methods to store key info #
   #############################
@@ -62,10 +98,19 @@ class CaptureAgent(Agent):
     self.red = true if you're on the red team, false otherwise
     self.agentsOnTeam = a list of agent objects that make up your team
     self.distancer = distance calculator (contest code provides this)
-    self.observationHistory = list of GameState objects that correspond
+    self.observationHistory = list-like sequence of GameState objects that correspond
         to the sequential order of states that have occurred so far this game
+        (see historyPolicy)
     self.timeForComputing = an amount of time to give each turn for computing maze distances
         (part of the provided distance calculator)
+    self.deadline = time.monotonic() timestamp at which the current move (or
+        registerInitialState) budget runs out, or None if the game did not set one
+    self.teamContext = TeamContext shared with your teammate if createTeam set
+        one up (otherwise one of your own, created in registerInitialState)
+    self.precomputed = per-layout analyses computed at startup, read as
+        attributes (self.precomputed.mazeDistances; see precomputation.py)
+    self.featureProfiler = FeatureProfiler timing your getFeatures, if
+        profileFeatures is on (see featureProfiler.py)
     """
     # Agent index for querying state
     self.index = index
@@ -80,7 +125,7 @@ class CaptureAgent(Agent):
     self.distancer = None
 
     # A history of observations
-    self.observationHistory = []
+    self.observationHistory = observationHistory.makeObservationHistory(self.historyPolicy, self.historyLength)
 
     # Time to spend each turn on computing maze distances
     self.timeForComputing = timeForComputing
@@ -88,6 +133,29 @@ class CaptureAgent(Agent):
     # Access to the graphics
     self.display = None
 
+    # End of the current time budget, set by the game before each call
+    self.deadline = None
+
+    # Successors generated during the current turn (see getCachedSuccessor)
+    self.successorCache = {}
+
+    # Background thinking between moves
+    self.ponderThread = None
+    self.ponderStop = None
+
+    # Data shared with teammates
+    self.teamContext = None
+
+    # Set up in registerInitialState if profileFeatures is on
+    self.featureProfiler = None
+
+    # Per-layout analyses, run during registerInitialState
+    cacheDir = None
+    if self.precomputeCache: cacheDir = precomputation.defaultCacheDir()
+    self.precomputed = precomputation.Precomputations(cacheDir)
+    # Breadth-first search is faster than reading the table back from disk
+    self.precomputed.register('mazeDistances', precomputation.mazeDistances, priority=100, cache=False)
+
   def registerInitialState(self, gameState):
     """
     This method handles the initial setup of the
@@ -99,17 +167,39 @@ class CaptureAgent(Agent):
     self.distancer.getDistance(p1, p2)
     """
     self.red = gameState.isOnRedTeam(self.index)
-    self.distancer = distanceCalculator.Distancer(gameState.data.layout)
-
-    # comment this out to forgo maze distance computation and use manhattan distances
-    self.distancer.getMazeDistances()
+    if self.teamContext is None:
+      TeamContext(self.red).addAgents([self])
+    # Intentions left during an earlier game are stale
+    self.teamContext.setIntention(self.index, None)
+    self.runPrecomputations(gameState)
+    if self.profileFeatures and self.featureProfiler is None and hasattr(self, 'getFeatures'):
+      import featureProfiler
+      self.featureProfiler = featureProfiler.FeatureProfiler(self)
+    # Teammates sharing a context share one distancer
+    self.distancer = self.teamContext.getDistancer(gameState)
 
     import __main__
     if '_display' in dir(__main__):
       self.display = __main__._display
 
+  def runPrecomputations(self, gameState):
+    """
+    Runs the analyses registered on self.precomputed for this layout until
+    only startupReserve seconds of the startup budget are left, and hands
+    the maze distances to the distance calculator.
+    """
+    self.precomputed.bind(gameState)
+    deadline = float('inf')
+    if self.deadline is not None: deadline = self.deadline - self.startupReserve
+    self.precomputed.run(deadline)
+    walls = gameState.data.layout.walls
+    if walls not in distanceCalculator.distanceMap:
+      distanceCalculator.distanceMap[walls] = self.precomputed.mazeDistances
+
   def final(self, gameState):
-    self.observationHistory = []
+    self.stopPondering()
+    self.successorCache = {}
+    self.observationHistory = observationHistory.makeObservationHistory(self.historyPolicy, self.historyLength)
 
   def registerTeam(self, agentsOnTeam):
     """
@@ -137,6 +227,72 @@ class CaptureAgent(Agent):
       if isinstance(self.display, PacmanGraphics):
         self.display.clearDebug()
 
+  ###################
+  # Time Management #
+  ###################
+
+  # Seconds kept in reserve when deciding whether there is time left to search
+  deadlineMargin = 0.1
+
+  def setDeadline(self, deadline):
+    """
+    Called by the game with a time.monotonic() timestamp before
+    registerInitialState and before each move (observationFunction and
+    getAction share the same budget).  Pondering stops here, and the time
+    spent waiting for it is added to the budget.
+    """
+    self.deadline = deadline + self.stopPondering()
+
+  def timeRemaining(self):
+    """
+    Returns the number of seconds left in the current budget, or infinity
+    if the game did not provide a deadline.
+    """
+    if self.deadline is None:
+      return float('inf')
+    return self.deadline - time.monotonic()
+
+  def isTimeUp(self):
+    """
+    Returns true once less than deadlineMargin seconds are left.
+    """
+    return self.timeRemaining() < self.deadlineMargin
+
+  def checkTime(self):
+    """
+    Raises SearchTimeout once the budget is exhausted.  Call this from
+    inside a search to abandon the current iteration of iterativeDeepening.
+    """
+    if self.isTimeUp():
+      raise SearchTimeout()
+
+  def iterativeDeepening(self, searchFunction, default=None, startDepth=1, maxDepth=64):
+    """
+    Calls searchFunction(depth) for depth = startDepth, startDepth + 1, ...
+    and returns the result of the deepest search that completed.
+
+    A new iteration is only started if, judging by the growth of the previous
+    iterations, it is expected to finish before the deadline.  An iteration
+    that raises SearchTimeout (see checkTime) is discarded.  If no iteration
+    completes, default is returned.  Without a deadline the loop runs until
+    maxDepth.
+    """
+    best = default
+    lastDuration = prevDuration = None
+    for depth in range(startDepth, maxDepth + 1):
+      if lastDuration is not None:
+        growth = 2.0
+        if prevDuration: growth = max(growth, lastDuration / prevDuration)
+        if lastDuration * growth > self.timeRemaining() - self.deadlineMargin:
+          break
+      start = time.monotonic()
+      try:
+        best = searchFunction(depth)
+      except SearchTimeout:
+        break
+      prevDuration, lastDuration = lastDuration, time.monotonic() - start
+    return best
+
   #################
   # Action Choice #
   #################
@@ -151,6 +307,9 @@ class CaptureAgent(Agent):
     move - this occurs because Pacman agents move half as quickly as ghost agents).
 
     """
+    global movesInProgress
+    self.stopPondering()
+    self.successorCache = {}
     self.observationHistory.append(gameState)
 
     myState = gameState.getAgentState(self.index)
@@ -158,8 +317,13 @@ class CaptureAgent(Agent):
     if myPos != nearestPoint(myPos):
       # We're halfway from one position to the next
       return gameState.getLegalActions(self.index)[0]
-    else:
-      return self.chooseAction(gameState)
+    movesInProgress += 1
+    try:
+      action = self.chooseAction(gameState)
+    finally:
+      movesInProgress -= 1
+    self.startPondering(gameState, action)
+    return action
 
   def chooseAction(self, gameState):
     """
@@ -168,6 +332,102 @@ class CaptureAgent(Agent):
     """
     util.raiseNotDefined()
 
+  #############
+  # Pondering #
+  #############
+
+  def startPondering(self, gameState, action):
+    """
+    Called by getAction after choosing action in gameState.  If ponder is
+    set, calls ponderStep repeatedly in a background thread until the game
+    next calls setDeadline (or getAction) on this agent or ponderTime
+    seconds have passed.  The thread pauses while any CaptureAgent is in
+    chooseAction.
+    """
+    if not self.ponder: return
+    self.stopPondering()
+    import threading
+    stop = threading.Event()
+    end = time.monotonic() + self.ponderTime
+    def ponderLoop():
+      while not stop.is_set() and time.monotonic() < end:
+        if movesInProgress:
+          stop.wait(0.001)
+        elif not self.ponderStep():
+          return
+    self.ponderStop = stop
+    self.ponderThread = threading.Thread(target=ponderLoop)
+    self.ponderThread.daemon = True
+    self.ponderThread.start()
+
+  def stopPondering(self):
+    """
+    Stops the background thread, if any, and returns the seconds spent
+    waiting for it.
+    """
+    if self.ponderThread is None: return 0.0
+    start = time.monotonic()
+    self.ponderStop.set()
+    self.ponderThread.join()
+    self.ponderThread = None
+    self.ponderStop = None
+    return time.monotonic() - start
+
+  def ponderStep(self):
+    """
+    Override this to think while the other agents move: do a short unit of
+    work (the thread checks for the stop signal between calls) and return
+    False when there is nothing left to do.  Only the pondering thread runs
+    agent code until stopPondering returns, so no locking is needed.
+    """
+    return False
+
+  ###################
+  # Feature Vectors #
+  ###################
+
+  def getFeatureSchema(self):
+    """
+    Returns the FeatureSchema shared by all agents of this class.
+    """
+    cls = self.__class__
+    if '_featureSchema' not in cls.__dict__:
+      cls._featureSchema = FeatureSchema(self.featureNames or [])
+    return cls._featureSchema
+
+  def evaluate(self, gameState, action):
+    """
+    Computes a linear combination of features and feature weights.
+    """
+    return self.getFeatures(gameState, action) * self.getWeights(gameState, action)
+
+  def evaluateActions(self, gameState, actions, features=None):
+    """
+    Returns the values evaluate(gameState, action) for all the actions at once.
+    The features of every action go into one NumPy matrix (one row per action,
+    one column per feature name of the class's schema), which is multiplied
+    by the weight vector.  getFeatures and getWeights keep returning Counters
+    or dictionaries; callers that need the Counters themselves can pass them
+    as features.  Classes that override evaluate, and runs without NumPy,
+    get evaluate called for each action instead.
+    """
+    if type(self).evaluate is not CaptureAgent.evaluate:
+      return [self.evaluate(gameState, action) for action in actions]
+    try:
+      import numpy
+    except ImportError:
+      return [self.evaluate(gameState, action) for action in actions]
+    schema = self.getFeatureSchema()
+    if features is None:
+      features = [self.getFeatures(gameState, action) for action in actions]
+    features = schema.matrix(features)
+    # Names that only appear among the weights have no feature column to multiply
+    if self.staticWeights:
+      weights = schema.vector(self.getWeights(gameState, actions[0]))
+      return features.dot(weights[:features.shape[1]])
+    weights = schema.matrix([self.getWeights(gameState, action) for action in actions])
+    return numpy.einsum('ij,ij->i', features, weights[:, :features.shape[1]])
+
   #######################
   # Convenience Methods #
   #######################
@@ -247,6 +507,35 @@ class CaptureAgent(Agent):
     d = self.distancer.getDistance(pos1, pos2)
     return d
 
+  def getSuccessor(self, gameState, action):
+    """
+    Finds the next successor which is a grid position (location tuple),
+    i.e. the state after this agent takes action, continuing through half
+    positions.  Uses getCachedSuccessor, so feature and weight functions can
+    all call this for the same action cheaply.
+    """
+    successor = self.getCachedSuccessor(gameState, self.index, action)
+    pos = successor.getAgentState(self.index).getPosition()
+    if pos != nearestPoint(pos):
+      # Only half a grid position was covered
+      return self.getCachedSuccessor(successor, self.index, action)
+    else:
+      return successor
+
+  def getCachedSuccessor(self, gameState, agentIndex, action):
+    """
+    gameState.generateSuccessor(agentIndex, action), generated at most once
+    per turn for the same state object.  Each entry holds on to its state
+    and is only used for that very object, so a recycled id() can never
+    return another state's successor.  getAction empties the cache.
+    """
+    key = (id(gameState), agentIndex, action)
+    entry = self.successorCache.get(key)
+    if entry is None or entry[0] is not gameState:
+      entry = (gameState, gameState.generateSuccessor(agentIndex, action))
+      self.successorCache[key] = entry
+    return entry[1]
+
   def getPreviousObservation(self):
     """
     Returns the GameState object corresponding to the last state this agent saw
@@ -291,6 +580,164 @@ class CaptureAgent(Agent):
   #     self._distributions = dists # These can be read by pacclient.py
   # ***END REMOVED FOR CONTEST 2***
 
+class TeamContext:
+  """
+  Data shared by the agents of one team.  createTeam wires it up:
+
+    agents = [eval(first)(firstIndex), eval(second)(secondIndex)]
+    TeamContext(isRed).addAgents(agents)
+    return agents
+
+  It holds the team's Distancer and home boundary, each computed once per
+  game instead of once per agent (or, for the boundary, once per action),
+  per-turn quantities derived from the current observation (computed once
+  no matter how many actions or features ask for them) and a blackboard
+  dict in which teammates can leave each other their intentions.
+  """
+  def __init__(self, isRed):
+    self.red = isRed
+    self.agents = []
+    self.blackboard = {}
+    self.layout = None
+    self.distancer = None
+    self.boundaryLayout = None
+    self.homeBoundary = None
+    self.turnState = None
+    self.turnValues = {}
+
+  def addAgents(self, agents):
+    for agent in agents:
+      agent.teamContext = self
+      self.agents.append(agent)
+
+  def getDistancer(self, gameState):
+    layout = gameState.data.layout
+    if self.distancer is None or layout is not self.layout:
+      self.layout = layout
+      self.distancer = distanceCalculator.Distancer(layout)
+      # comment this out to forgo maze distance computation and use manhattan distances
+      self.distancer.getMazeDistances()
+    return self.distancer
+
+  def getHomeBoundary(self, gameState):
+    """
+    The open cells of the team's column next to the middle of the board, in
+    order of increasing y.  A Pacman scores once it reaches one of them.
+    """
+    layout = gameState.data.layout
+    if self.homeBoundary is None or layout is not self.boundaryLayout:
+      x = layout.width // 2
+      if self.red: x -= 1
+      self.boundaryLayout = layout
+      self.homeBoundary = [(x, y) for y in range(layout.height) if not layout.walls[x][y]]
+    return self.homeBoundary
+
+  def perTurn(self, gameState, name, compute):
+    """
+    Returns compute(gameState), computed only once for each observed state:
+    the values are dropped as soon as another state is passed in, i.e. on
+    the next turn.  Pass the state given to chooseAction, not successors.
+    The values are shared, so do not modify them.
+    """
+    if gameState is not self.turnState:
+      self.turnState = gameState
+      self.turnValues = {}
+    if name not in self.turnValues:
+      self.turnValues[name] = compute(gameState)
+    return self.turnValues[name]
+
+  def getOpponents(self, gameState):
+    if self.red: return gameState.getBlueTeamIndices()
+    return gameState.getRedTeamIndices()
+
+  def getFoodToEat(self, gameState):
+    """
+    The set of food positions on the opponents' side.
+    """
+    def compute(gameState):
+      if self.red: return set(gameState.getBlueFood().asList())
+      return set(gameState.getRedFood().asList())
+    return self.perTurn(gameState, 'foodToEat', compute)
+
+  def getInvaders(self, gameState):
+    """
+    The indices of the opponents seen as Pacmen on the team's side.
+    """
+    def compute(gameState):
+      return [i for i in self.getOpponents(gameState)
+              if gameState.getAgentState(i).isPacman and gameState.getAgentPosition(i) is not None]
+    return self.perTurn(gameState, 'invaders', compute)
+
+  def getDangerMap(self, gameState):
+    """
+    A dictionary from each open cell to the maze distance to the nearest
+    opponent ghost that can eat a Pacman (seen and not scared).  Empty if
+    there is no such ghost.
+    """
+    def compute(gameState):
+      ghosts = []
+      for i in self.getOpponents(gameState):
+        state = gameState.getAgentState(i)
+        if not state.isPacman and state.scaredTimer == 0 and gameState.getAgentPosition(i) is not None:
+          ghosts.append(gameState.getAgentPosition(i))
+      if not ghosts: return {}
+      distancer = self.getDistancer(gameState)
+      return dict([(cell, min([distancer.getDistance(cell, ghost) for ghost in ghosts]))
+                   for cell in gameState.getWalls().asList(False)])
+    return self.perTurn(gameState, 'dangerMap', compute)
+
+  def setIntention(self, agentIndex, intention):
+    """
+    Leaves intention (e.g. the food cell an agent is heading for) on the
+    blackboard for the agent's teammates.  It stays until replaced.
+    """
+    self.blackboard[agentIndex] = intention
+
+  def getIntention(self, agentIndex):
+    "The intention agentIndex last left on the blackboard, or None"
+    return self.blackboard.get(agentIndex)
+
+class FeatureSchema:
+  """
+  Maps feature names to columns.  Names are appended in the order they are
+  first seen, so a column never changes meaning during a game.
+  """
+  def __init__(self, names=[]):
+    self.names = []
+    self.columns = {}
+    for name in names: self.column(name)
+
+  def __len__(self):
+    return len(self.names)
+
+  def column(self, name):
+    if name not in self.columns:
+      self.columns[name] = len(self.names)
+      self.names.append(name)
+    return self.columns[name]
+
+  def matrix(self, counters):
+    """
+    One row per Counter (or dictionary) of features, with the schema
+    extended by any new names.
+    """
+    import numpy
+    column = self.column
+    cells = [[(column(name), value) for name, value in counter.items()] for counter in counters]
+    rows = []
+    for rowCells in cells:
+      row = [0.0] * len(self.names)
+      for i, value in rowCells: row[i] = value
+      rows.append(row)
+    return numpy.array(rows, dtype=float).reshape(len(counters), len(self.names))
+
+  def vector(self, counter):
+    return self.matrix([counter])[0]
+
+class SearchTimeout(Exception):
+  "Raised by CaptureAgent.checkTime when the move budget is exhausted"
+  pass
+
 class TimeoutAgent( Agent ):
   """
   A random agent that takes too much time. Taking
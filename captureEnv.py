@@ -0,0 +1,226 @@
+# captureEnv.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Gym-style environments over capture.GameState for self-play training.
+
+CaptureEnv is a single game stepped one move at a time: every call to
+step(action) moves the agent whose turn it is.  VecCaptureEnv runs N
+independent CaptureEnvs, spread over worker processes, and steps them all
+at once:
+
+  envs = VecCaptureEnv(64, numWorkers=4)
+  observations = envs.reset(range(64))
+  while training:
+    actions = [policy(o) for o in observations]
+    observations, rewards, dones, infos = envs.step(actions)
+  envs.close()
+
+Games bypass Game.run entirely (no display, muting or time limits).
+Observations are small Observation tuples; rewards are score changes from
+the red team's point of view.  A finished game is reset automatically with
+its seed advanced by the number of environments, and its last observation
+is returned in info['terminalObservation'].
+"""
+
+import random
+from collections import namedtuple
+from game import Directions
+
+ACTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.STOP]
+
+# positions, isPacman, scaredTimers, numCarrying: one entry per agent.
+# food: bitmask with bit (x * height + y) set if (x, y) has food.
+# legalActions: bitmask over ACTIONS for the agent to move.
+Observation = namedtuple('Observation', ['agentIndex', 'positions', 'isPacman', 'scaredTimers',
+                                         'numCarrying', 'food', 'capsules', 'score', 'timeleft',
+                                         'legalActions'])
+
+def foodBits(food):
+  bits = 0
+  height = food.height
+  for x in range(food.width):
+    column = food[x]
+    for y in range(height):
+      if column[y]: bits |= 1 << (x * height + y)
+  return bits
+
+class CaptureEnv:
+  """
+  One capture game.  layoutName is a layout file name, 'RANDOM<seed>' or
+  None for a fresh random maze (chosen from the reset seed) every game.
+  """
+  def __init__(self, layoutName=None, length=1200, numAgents=4):
+    self.layoutName = layoutName
+    self.length = length
+    self.numAgents = numAgents
+    self.state = None
+    self.agentIndex = 0
+    self.numMoves = 0
+    self.seed = None
+
+  def makeLayout(self, rng):
+    import layout, capture
+    if self.layoutName is None:
+      return layout.Layout(capture.randomLayout(rng.randint(1, 99999999)).split('\n'))
+    if self.layoutName.startswith('RANDOM'):
+      return layout.Layout(capture.randomLayout(int(self.layoutName[6:])).split('\n'))
+    l = layout.getLayout(self.layoutName)
+    if l == None: raise Exception("The layout " + self.layoutName + " cannot be found")
+    return l
+
+  def reset(self, seed=None):
+    from capture import GameState
+    self.seed = seed
+    rng = random.Random(seed)
+    self.state = GameState()
+    self.state.initialize(self.makeLayout(rng), self.numAgents)
+    self.state.data.timeleft = self.length
+    self.agentIndex = rng.randint(0, 1)
+    self.numMoves = 0
+    return self.observation()
+
+  def step(self, action):
+    """
+    Moves the agent whose turn it is and returns (observation, reward,
+    done, info).
+    """
+    oldScore = self.state.data.score
+    self.state = self.state.generateSuccessor(self.agentIndex, action)
+    self.numMoves += 1
+    if self.numMoves == self.length:
+      self.state.data._win = True
+    self.agentIndex = (self.agentIndex + 1) % self.numAgents
+    reward = self.state.data.score - oldScore
+    done = self.state.isOver()
+    return self.observation(), reward, done, {'score': self.state.data.score, 'moves': self.numMoves}
+
+  def legalActions(self):
+    return self.state.getLegalActions(self.agentIndex)
+
+  def observation(self):
+    data = self.state.data
+    legal = 0
+    for action in self.legalActions():
+      legal |= 1 << ACTIONS.index(action)
+    return Observation(self.agentIndex,
+                       tuple([self.state.getAgentPosition(i) for i in range(self.numAgents)]),
+                       tuple([a.isPacman for a in data.agentStates]),
+                       tuple([a.scaredTimer for a in data.agentStates]),
+                       tuple([a.numCarrying for a in data.agentStates]),
+                       foodBits(data.food),
+                       tuple(data.capsules),
+                       data.score,
+                       data.timeleft,
+                       legal)
+
+class EnvGroup:
+  """
+  A list of CaptureEnvs stepped together; used in-process and inside each
+  worker of a VecCaptureEnv.
+  """
+  def __init__(self, numEnvs, stride, envArgs):
+    self.envs = [CaptureEnv(**envArgs) for i in range(numEnvs)]
+    self.stride = stride
+
+  def reset(self, seeds):
+    return [env.reset(seed) for env, seed in zip(self.envs, seeds)]
+
+  def step(self, actions):
+    results = []
+    for env, action in zip(self.envs, actions):
+      observation, reward, done, info = env.step(action)
+      if done:
+        info['terminalObservation'] = observation
+        nextSeed = None
+        if env.seed is not None: nextSeed = env.seed + self.stride
+        observation = env.reset(nextSeed)
+      results.append((observation, reward, done, info))
+    return results
+
+def workerLoop(connection, numEnvs, stride, envArgs):
+  group = EnvGroup(numEnvs, stride, envArgs)
+  while True:
+    command, data = connection.recv()
+    if command == 'reset':
+      connection.send(group.reset(data))
+    elif command == 'step':
+      connection.send(group.step(data))
+    elif command == 'close':
+      connection.close()
+      return
+
+class VecCaptureEnv:
+  """
+  numEnvs independent games split over numWorkers processes (0 runs them
+  in this process).  Extra keyword arguments go to each CaptureEnv.
+  """
+  def __init__(self, numEnvs, numWorkers=None, **envArgs):
+    import multiprocessing
+    if numWorkers is None: numWorkers = min(numEnvs, multiprocessing.cpu_count())
+    self.numEnvs = numEnvs
+    self.numWorkers = numWorkers
+    if numWorkers == 0:
+      self.local = EnvGroup(numEnvs, numEnvs, envArgs)
+      return
+    self.local = None
+    self.slices = []
+    self.connections = []
+    self.processes = []
+    for w in range(numWorkers):
+      start, end = w * numEnvs // numWorkers, (w + 1) * numEnvs // numWorkers
+      parent, child = multiprocessing.Pipe()
+      process = multiprocessing.Process(target=workerLoop, args=(child, end - start, numEnvs, envArgs))
+      process.daemon = True
+      process.start()
+      child.close()
+      self.slices.append((start, end))
+      self.connections.append(parent)
+      self.processes.append(process)
+
+  def _broadcast(self, command, values):
+    values = list(values)
+    if len(values) != self.numEnvs:
+      raise Exception('Expected %d values, got %d' % (self.numEnvs, len(values)))
+    if self.local is not None:
+      return getattr(self.local, command)(values)
+    for connection, (start, end) in zip(self.connections, self.slices):
+      connection.send((command, values[start:end]))
+    results = []
+    for connection in self.connections:
+      results.extend(connection.recv())
+    return results
+
+  def reset(self, seeds=None):
+    if seeds is None: seeds = [None for i in range(self.numEnvs)]
+    return self._broadcast('reset', seeds)
+
+  def step(self, actions):
+    """
+    Returns lists (observations, rewards, dones, infos).
+    """
+    results = self._broadcast('step', actions)
+    return tuple([list(column) for column in zip(*results)])
+
+  def close(self):
+    if self.local is not None: return
+    for connection in self.connections:
+      connection.send(('close', None))
+    for process in self.processes:
+      process.join()
+    self.connections = []
+    self.processes = []
+
+def legalActionsOf(observation):
+  return [action for i, action in enumerate(ACTIONS) if observation.legalActions & (1 << i)]
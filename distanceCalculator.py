@@ -22,6 +22,7 @@ distancer.getDistance( (1,1), (10,10) )
 """
 
 import sys, time, random
+import array, collections
 
 class Distancer:
   def __init__(self, layout, default = 10000):
@@ -107,47 +108,87 @@ class DistanceCalculator:
 
     self.distancer._distances = distances
 
+# Above this many open cells, mazes get LazyDistances instead of a table of
+# all pairs (which grows with the square of the number of cells)
+LARGE_MAZE_CELLS = 1024
+
+def mazeGraph(layout):
+    "The open cells of the layout and, for each, the indices of its neighbors"
+    cells = layout.walls.asList(False)
+    indices = dict([(cell, i) for i, cell in enumerate(cells)])
+    neighbors = []
+    for x, y in cells:
+        adjacent = [(x,y+1), (x,y-1), (x+1,y), (x-1,y)]
+        neighbors.append([indices[other] for other in adjacent if other in indices])
+    return cells, indices, neighbors
+
+def breadthFirstRow(neighbors, source):
+    "Distances from cell source to every cell (sys.maxsize if unreachable)"
+    row = [sys.maxsize] * len(neighbors)
+    row[source] = 0
+    frontier = [source]
+    distance = 0
+    while frontier:
+        distance += 1
+        nextFrontier = []
+        for node in frontier:
+            for other in neighbors[node]:
+                if row[other] > distance:
+                    row[other] = distance
+                    nextFrontier.append(other)
+        frontier = nextFrontier
+    return row
+
 def computeDistances(layout):
-    "Runs UCS to all other positions from each position"
+    "Runs a breadth-first search to all other positions from each position"
+    cells, indices, neighbors = mazeGraph(layout)
+    if len(cells) > LARGE_MAZE_CELLS:
+        return LazyDistances(layout)
     distances = {}
-    allNodes = layout.walls.asList(False)
-    for source in allNodes:
-        dist = {}
-        closed = {}
-        for node in allNodes:
-            dist[node] = sys.maxsize
-        import util
-        queue = util.PriorityQueue()
-        queue.push(source, 0)
-        dist[source] = 0
-        while not queue.isEmpty():
-            node = queue.pop()
-            if node in closed:
-                continue
-            closed[node] = True
-            nodeDist = dist[node]
-            adjacent = []
-            x, y = node
-            if not layout.isWall((x,y+1)):
-                adjacent.append((x,y+1))
-            if not layout.isWall((x,y-1)):
-                adjacent.append((x,y-1) )
-            if not layout.isWall((x+1,y)):
-                adjacent.append((x+1,y) )
-            if not layout.isWall((x-1,y)):
-                adjacent.append((x-1,y))
-            for other in adjacent:
-                if not other in dist:
-                    continue
-                oldDist = dist[other]
-                newDist = nodeDist+1
-                if newDist < oldDist:
-                    dist[other] = newDist
-                    queue.push(other, newDist)
-        for target in allNodes:
-            distances[(target, source)] = dist[target]
+    for s, source in enumerate(cells):
+        row = breadthFirstRow(neighbors, s)
+        for t, target in enumerate(cells):
+            distances[(target, source)] = row[t]
     return distances
 
+class LazyDistances:
+    """
+    The maze distances of a large layout, looked up like the table
+    computeDistances returns (distances[(pos1, pos2)]).  Each lookup uses the
+    breadth-first row of pos1 or pos2, computing the row of pos1 if neither
+    is known; the maxRows most recently used rows are kept.
+    """
+    def __init__(self, layout, maxRows = 256):
+        self.cells, self.indices, self.neighbors = mazeGraph(layout)
+        self.maxRows = maxRows
+        self.rows = collections.OrderedDict()
+
+    def __contains__(self, key):
+        return key[0] in self.indices and key[1] in self.indices
+
+    def __getitem__(self, key):
+        pos1, pos2 = key
+        rows = self.rows
+        if pos1 in rows:
+            rows.move_to_end(pos1)
+            return rows[pos1][self.indices[pos2]]
+        if pos2 in rows:
+            rows.move_to_end(pos2)
+            return rows[pos2][self.indices[pos1]]
+        # 'q' is 64 bits everywhere; 'l' is 32 bits on Windows and cannot hold sys.maxsize
+        row = array.array('q', breadthFirstRow(self.neighbors, self.indices[pos1]))
+        rows[pos1] = row
+        if len(rows) > self.maxRows: rows.popitem(last=False)
+        return row[self.indices[pos2]]
+
+    def __len__(self):
+        return len(self.cells) ** 2
+
+    def __getstate__(self):
+        # Rows are cheap to recompute; do not copy them when pickled
+        state = self.__dict__.copy()
+        state['rows'] = collections.OrderedDict()
+        return state
 
 def getDistanceOnGrid(distances, pos1, pos2):
     key = (pos1, pos2)
@@ -0,0 +1,102 @@
+# fastReplay.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Headless replay of recorded games with random access.
+
+FastReplay re-simulates a game without a display and keeps every
+keyframeInterval-th state, so that the state after any move n can later be
+rebuilt by stepping at most keyframeInterval - 1 moves from the nearest
+keyframe.
+
+  python fastReplay.py replay-...pcr --seek 600
+"""
+
+import sys, time
+
+class FastReplay:
+  def __init__(self, layout, actions, length, keyframeInterval=100, numAgents=4):
+    from capture import GameState
+    self.actions = actions
+    self.keyframeInterval = keyframeInterval
+    initState = GameState()
+    initState.initialize(layout, numAgents)
+    initState.data.timeleft = length
+    self.keyframes = [initState]
+    self.movesPerSecond = None
+    self.finalState = None
+
+  def fromRecord(path, keyframeInterval=100):
+    import gameRecord
+    recorded = gameRecord.loadReplay(path)
+    return FastReplay(recorded['layout'], recorded['actions'], recorded['length'],
+                      keyframeInterval, len(recorded['agents']))
+  fromRecord = staticmethod(fromRecord)
+
+  def build(self):
+    """
+    Simulates the whole game once, storing keyframes, and returns the
+    replay speed in moves per second.
+    """
+    state = self.keyframes[0]
+    self.keyframes = [state]
+    start = time.perf_counter()
+    for n, (agentIndex, action) in enumerate(self.actions):
+      state = state.generateSuccessor(agentIndex, action)
+      if (n + 1) % self.keyframeInterval == 0:
+        # Successors never modify their predecessors, so no copy is needed
+        self.keyframes.append(state)
+    elapsed = time.perf_counter() - start
+    self.finalState = state
+    self.movesPerSecond = len(self.actions) / max(elapsed, 1e-9)
+    return self.movesPerSecond
+
+  def numMoves(self):
+    return len(self.actions)
+
+  def stateAt(self, n):
+    """
+    Returns the state after the first n moves (0 is the initial state).
+    """
+    if n < 0 or n > len(self.actions):
+      raise IndexError('move %d is outside the recorded game' % n)
+    if self.finalState is None: self.build()
+    keyframe = min(n // self.keyframeInterval, len(self.keyframes) - 1)
+    state = self.keyframes[keyframe]
+    for agentIndex, action in self.actions[keyframe * self.keyframeInterval:n]:
+      state = state.generateSuccessor(agentIndex, action)
+    return state
+
+def readCommand(argv):
+  from optparse import OptionParser
+  parser = OptionParser('USAGE: python fastReplay.py <record file> [options]')
+  parser.add_option('-k', '--keyframe-interval', type='int', dest='keyframeInterval', default=100,
+                    help='Moves between stored keyframes [Default: %default]')
+  parser.add_option('-s', '--seek', type='int', default=None,
+                    help='Print the board after this many moves')
+  options, args = parser.parse_args(argv)
+  if len(args) != 1: parser.error('expected exactly one record file')
+  return args[0], options
+
+if __name__ == '__main__':
+  path, options = readCommand(sys.argv[1:])
+  replay = FastReplay.fromRecord(path, options.keyframeInterval)
+  movesPerSecond = replay.build()
+  print('Replayed %d moves at %.0f moves/s (%d keyframes)' % (replay.numMoves(), movesPerSecond, len(replay.keyframes)))
+  print('Final score: %d' % replay.finalState.getScore())
+  if options.seek is not None:
+    start = time.perf_counter()
+    state = replay.stateAt(options.seek)
+    print('State after move %d (seek took %.2f ms):' % (options.seek, 1000 * (time.perf_counter() - start)))
+    print(state)
@@ -0,0 +1,173 @@
+# featureProfiler.py
+# ------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Per-feature profiling of reflex agents (python capture.py --profile-features).
+
+Reflex agents build their features one assignment at a time:
+
+  features = util.Counter()
+  successor = self.getSuccessor(gameState, action)
+  features['successorScore'] = -len(foodList)
+  ...
+  features['distanceToFood'] = minDistance
+
+The profiler replaces the getFeatures of one agent (an instance attribute)
+with a wrapper that traces the lines of that agent's getFeatures frame.
+When a line has assigned a feature of the Counter held in a local variable
+(the one named features, or else the first Counter), the time since the
+previous assignment (or since the Counter was created) is charged to that
+feature, together with the getMazeDistance and getSuccessor calls the agent
+made in that time.  Work before the Counter is created is charged to
+'(before features)' and work after the last assignment to
+'(after features)'.  A feature assigned twice is charged twice, unless the
+second assignment stores the same value.
+
+Nothing outside the agent is patched.  The line tracer is installed for the
+current thread only while getFeatures runs, and the previous tracer (a
+debugger, coverage) is put back in a finally clause.
+"""
+
+import sys, time
+import util
+
+BEFORE = '(before features)'
+AFTER = '(after features)'
+
+class FeatureProfiler:
+  """
+  Profiles the getFeatures method of one agent.  Per game, for every feature:
+  seconds, number of evaluations, and the number and seconds of the
+  getMazeDistance and getSuccessor calls made while computing it.
+  """
+  def __init__(self, agent):
+    self.agent = agent
+    self.reset()
+    self.active = False
+    self.getFeatures = agent.getFeatures
+    self.code = getattr(self.getFeatures, '__code__', None) or self.getFeatures.__func__.__code__
+    agent.getFeatures = self.profiledGetFeatures
+    # Per-agent wrappers; they only count while getFeatures is profiled
+    agent.getMazeDistance = self.timed(agent.getMazeDistance, 0)
+    if hasattr(agent, 'getSuccessor'):
+      agent.getSuccessor = self.timed(agent.getSuccessor, 2)
+
+  def reset(self):
+    self.stats = {}        # feature -> [seconds, evaluations, distance calls, distance seconds, successor calls, successor seconds]
+    self.calls = [0, 0.0, 0, 0.0]
+    self.evaluations = 0
+    self.features = None
+    self.assigned = None
+    self.lastTime = None
+    self.lastCalls = None
+
+  def mark(self):
+    self.lastTime = time.perf_counter()
+    self.lastCalls = list(self.calls)
+
+  def charge(self, name):
+    now = time.perf_counter()
+    entry = self.stats.get(name)
+    if entry is None:
+      entry = self.stats[name] = [0.0, 0, 0, 0.0, 0, 0.0]
+    entry[0] += now - self.lastTime
+    entry[1] += 1
+    for i in range(4):
+      entry[2 + i] += self.calls[i] - self.lastCalls[i]
+    self.lastTime = now
+    self.lastCalls = list(self.calls)
+
+  def timed(self, function, slot):
+    def wrapper(*args):
+      if not self.active: return function(*args)
+      start = time.perf_counter()
+      try:
+        return function(*args)
+      finally:
+        # self.calls is replaced by reset, so look it up every time
+        calls = self.calls
+        calls[slot] += 1
+        calls[slot + 1] += time.perf_counter() - start
+    return wrapper
+
+  def findFeatures(self, frame):
+    variables = frame.f_locals
+    counter = variables.get('features')
+    if isinstance(counter, util.Counter): return counter
+    for value in variables.values():
+      if isinstance(value, util.Counter): return value
+    return None
+
+  def chargeAssignments(self, frame):
+    """
+    Charges the features assigned (or changed) since the previous line.
+    """
+    if self.features is None:
+      self.features = self.findFeatures(frame)
+      if self.features is None: return
+      self.charge(BEFORE)
+      self.assigned = {}
+    for name, value in list(self.features.items()):
+      if name not in self.assigned or self.assigned[name] != value:
+        self.assigned[name] = value
+        self.charge(name)
+
+  def trace(self, frame, event, arg):
+    # Only the agent's getFeatures frame is traced line by line
+    if frame.f_code is not self.code: return None
+    return self.traceLines
+
+  def traceLines(self, frame, event, arg):
+    if event in ('line', 'return'):
+      self.chargeAssignments(frame)
+    return self.traceLines
+
+  def profiledGetFeatures(self, gameState, action):
+    if self.active:   # Recursive call: profiled by the outer one
+      return self.getFeatures(gameState, action)
+    self.features = None
+    self.assigned = None
+    self.mark()
+    previousTrace = sys.gettrace()
+    self.active = True
+    sys.settrace(self.trace)
+    try:
+      return self.getFeatures(gameState, action)
+    finally:
+      sys.settrace(previousTrace)
+      self.active = False
+      self.charge(AFTER)
+      self.features = None
+      self.assigned = None
+      self.evaluations += 1
+
+  def report(self):
+    """
+    The features sorted by total time, most expensive first.
+    """
+    lines = ['Feature profile of agent %d (%s), %d evaluations:' %
+             (self.agent.index, self.agent.__class__.__name__, self.evaluations),
+             '  %-24s %10s %8s %9s %14s %14s' % ('feature', 'total ms', 'count', 'us each',
+                                                'distances (ms)', 'successors (ms)')]
+    total = 0.0
+    for name, entry in sorted(self.stats.items(), key=lambda item: -item[1][0]):
+      seconds, count, distances, distanceSeconds, successors, successorSeconds = entry
+      total += seconds
+      lines.append('  %-24s %10.2f %8d %9.1f %6d (%5.1f) %6d (%5.1f)' %
+                   (name, seconds * 1000, count, seconds * 1e6 / max(count, 1),
+                    distances, distanceSeconds * 1000, successors, successorSeconds * 1000))
+    lines.append('  %-24s %10.2f %8s %9s %6d (%5.1f) %6d (%5.1f)' %
+                 ('total', total * 1000, '', '', self.calls[0], self.calls[1] * 1000,
+                  self.calls[2], self.calls[3] * 1000))
+    return '\n'.join(lines)
@@ -22,8 +22,8 @@
 
 from util import *
 import time, os
-import traceback
 import sys
+from timingReport import TimingCollector
 
 #######################
 # Parts worth reading #
@@ -193,38 +193,38 @@ class Grid:
         return self.data == other.data
 
     def __hash__(self):
-        # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        # The hash of the integer with bit x * height + y set for every true
+        # cell, built in one pass (adding up powers of two is quadratic)
+        bits = ''.join([''.join([i and '1' or '0' for i in l]) for l in self.data])
+        if not bits: return hash(0)
+        return hash(int(bits[::-1], 2))
 
-    def copy(self):
-        g = Grid(self.width, self.height)
-        g.data = [x[:] for x in self.data]
+    def withData(self, data):
+        """
+        A grid of the same size holding data, without first building the
+        initial data that Grid() would (which costs as much as a copy).
+        """
+        g = Grid.__new__(Grid)
+        g.CELLS_PER_INT = self.CELLS_PER_INT
+        g.width = self.width
+        g.height = self.height
+        g.data = data
         return g
 
+    def copy(self):
+        return self.withData([x[:] for x in self.data])
+
     def deepCopy(self):
         return self.copy()
 
     def shallowCopy(self):
-        g = Grid(self.width, self.height)
-        g.data = self.data
-        return g
+        return self.withData(self.data)
 
     def count(self, item =True ):
         return sum([x.count(item) for x in self.data])
 
     def asList(self, key = True):
-        list = []
-        for x in range(self.width):
-            for y in range(self.height):
-                if self[x][y] == key: list.append( (x,y) )
-        return list
+        return [(x, y) for x, column in enumerate(self.data) for y, value in enumerate(column) if value == key]
 
     def packBits(self):
         """
@@ -395,7 +395,8 @@ class GameStateData:
     def deepCopy( self ):
         state = GameStateData( self )
         state.food = self.food.deepCopy()
-        state.layout = self.layout.deepCopy()
+        # The layout never changes during a game, so copies share it
+        state.layout = self.layout
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
@@ -530,6 +531,10 @@ class Game:
         self.agentTimeout = False
         import io
         self.agentOutput = [io.StringIO() for agent in agents]
+        self.timings = TimingCollector()
+        self.recorder = None
+        # Trusted games on a null display may use the streamlined loop in runHeadless
+        self.allowFastPath = True
 
     def getProgress(self):
         if self.gameOver:
@@ -539,7 +544,9 @@ class Game:
 
     def _agentCrash( self, agentIndex, quiet=False):
         "Helper method for handling agent crashes"
-        if not quiet: traceback.print_exc()
+        if not quiet:
+            import traceback
+            traceback.print_exc()
         self.gameOver = True
         self.agentCrashed = True
         self.rules.agentCrash(self, agentIndex)
@@ -563,11 +570,29 @@ class Game:
         sys.stdout = OLD_STDOUT
         sys.stderr = OLD_STDERR
 
+    def _setAgentDeadline(self, agent, budget):
+        """
+        Tells the agent when its current time budget runs out, as a
+        time.monotonic() timestamp.  Agents that do not define setDeadline
+        are left alone.
+        """
+        if hasattr(agent, 'setDeadline'):
+            agent.setDeadline(time.monotonic() + budget)
+
+    def canRunHeadless(self):
+        """
+        True if nothing in this game needs the full control loop: exceptions
+        and time limits are not enforced and the display draws nothing.
+        """
+        return (self.allowFastPath and not self.catchExceptions and
+                'checkNullDisplay' in dir(self.display) and self.display.checkNullDisplay())
 
     def run( self ):
         """
         Main control loop for game play.
         """
+        if self.canRunHeadless():
+            return self.runHeadless()
         self.display.initialize(self.state.data)
         self.numMoves = 0
 
@@ -584,6 +609,7 @@ class Game:
                 self._agentCrash(i, quiet=True)
                 return
             if ("registerInitialState" in dir(agent)):
+                self._setAgentDeadline(agent, self.rules.getMaxStartupTime(i))
                 self.mute(i)
                 if self.catchExceptions:
                     try:
@@ -593,6 +619,7 @@ class Game:
                             timed_func(self.state.deepCopy())
                             time_taken = time.time() - start_time
                             self.totalAgentTimes[i] += time_taken
+                            self.timings.record(i, 'registerInitialState', time_taken)
                         except TimeoutFunctionException:
                             print("Agent %d ran out of time on startup!" % i, file=sys.stderr)
                             self.unmute()
@@ -604,7 +631,9 @@ class Game:
                         self.unmute()
                         return
                 else:
+                    start_time = time.time()
                     agent.registerInitialState(self.state.deepCopy())
+                    self.timings.record(i, 'registerInitialState', time.time() - start_time)
                 ## TODO: could this exceed the total time
                 self.unmute()
 
@@ -616,6 +645,8 @@ class Game:
             agent = self.agents[agentIndex]
             move_time = 0
             skip_action = False
+            # The warning budget covers both observationFunction and getAction
+            self._setAgentDeadline(agent, self.rules.getMoveWarningTime(agentIndex))
             # Generate an observation of the state
             if 'observationFunction' in dir( agent ):
                 self.mute(agentIndex)
@@ -628,13 +659,16 @@ class Game:
                         except TimeoutFunctionException:
                             skip_action = True
                         move_time += time.time() - start_time
+                        self.timings.record(agentIndex, 'observationFunction', time.time() - start_time)
                         self.unmute()
                     except Exception as data:
                         self._agentCrash(agentIndex, quiet=False)
                         self.unmute()
                         return
                 else:
+                    start_time = time.time()
                     observation = agent.observationFunction(self.state.deepCopy())
+                    self.timings.record(agentIndex, 'observationFunction', time.time() - start_time)
                 self.unmute()
             else:
                 observation = self.state.deepCopy()
@@ -657,6 +691,7 @@ class Game:
                         self.unmute()
                         return
 
+                    self.timings.record(agentIndex, 'getAction', time.time() - start_time)
                     move_time += time.time() - start_time
 
                     if move_time > self.rules.getMoveWarningTime(agentIndex):
@@ -683,11 +718,16 @@ class Game:
                     self.unmute()
                     return
             else:
+                start_time = time.time()
                 action = agent.getAction(observation)
+                self.timings.record(agentIndex, 'getAction', time.time() - start_time)
             self.unmute()
 
             # Execute the action
             self.moveHistory.append( (agentIndex, action) )
+            if self.recorder is not None:
+                self.recorder.recordMove(agentIndex, action)
+            start_time = time.time()
             if self.catchExceptions:
                 try:
                     self.state = self.state.generateSuccessor( agentIndex, action )
@@ -698,6 +738,7 @@ class Game:
                     return
             else:
                 self.state = self.state.generateSuccessor( agentIndex, action )
+            self.timings.record(agentIndex, 'generateSuccessor', time.time() - start_time)
 
             # Change the display
             self.display.update( self.state.data )
@@ -727,3 +768,78 @@ class Game:
                     self.unmute()
                     return
         self.display.finish()
+
+    def runHeadless( self ):
+        """
+        Streamlined version of run for trusted games on a null display.
+
+        Agent capabilities are looked up once and the display is never
+        called.  Agents are muted with mute/unmute and see exactly the same
+        sequence of calls as in run, so a game plays out identically for the
+        same random seed.
+        """
+        self.numMoves = 0
+        agents = self.agents
+        numAgents = len(agents)
+        mute, unmute = self.mute, self.unmute
+        record = self.timings.record
+        # Restore the real streams if an agent raises while muted
+        oldStdout, oldStderr = sys.stdout, sys.stderr
+
+        try:
+            for i, agent in enumerate(agents):
+                if not agent:
+                    mute(i)
+                    # this is a null agent, meaning it failed to load
+                    # the other team wins
+                    print("Agent %d failed to load" % i, file=sys.stderr)
+                    unmute()
+                    self._agentCrash(i, quiet=True)
+                    return
+                if hasattr(agent, 'registerInitialState'):
+                    self._setAgentDeadline(agent, self.rules.getMaxStartupTime(i))
+                    mute(i)
+                    start_time = time.time()
+                    agent.registerInitialState(self.state.deepCopy())
+                    record(i, 'registerInitialState', time.time() - start_time)
+                    unmute()
+
+            setDeadline = [getattr(agent, 'setDeadline', None) for agent in agents]
+            observe = [getattr(agent, 'observationFunction', None) for agent in agents]
+            getAction = [agent.getAction for agent in agents]
+            recorder = self.recorder
+            process = self.rules.process
+            warningTimes = [self.rules.getMoveWarningTime(i) for i in range(numAgents)]
+
+            agentIndex = self.startingIndex
+            while not self.gameOver:
+                if setDeadline[agentIndex]: setDeadline[agentIndex](time.monotonic() + warningTimes[agentIndex])
+                mute(agentIndex)
+                start_time = time.time()
+                if observe[agentIndex]:
+                    observation = observe[agentIndex](self.state.deepCopy())
+                    record(agentIndex, 'observationFunction', time.time() - start_time)
+                    start_time = time.time()
+                else:
+                    observation = self.state.deepCopy()
+                action = getAction[agentIndex](observation)
+                record(agentIndex, 'getAction', time.time() - start_time)
+                unmute()
+
+                self.moveHistory.append( (agentIndex, action) )
+                if recorder is not None:
+                    recorder.recordMove(agentIndex, action)
+                start_time = time.time()
+                self.state = self.state.generateSuccessor( agentIndex, action )
+                record(agentIndex, 'generateSuccessor', time.time() - start_time)
+
+                process(self.state, self)
+                agentIndex = ( agentIndex + 1 ) % numAgents
+
+            for agentIndex, agent in enumerate(agents):
+                if hasattr(agent, 'final'):
+                    mute(agentIndex)
+                    agent.final( self.state )
+                    unmute()
+        finally:
+            sys.stdout, sys.stderr = oldStdout, oldStderr
@@ -0,0 +1,189 @@
+# gameRecord.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Compact game records.
+
+A record file (optionally gzip or lzma compressed) contains
+
+  MAGIC + one version byte
+  a 4-byte little-endian header length followed by a JSON header holding
+      the layout fingerprint and text, the game seed, the game length,
+      the team names, the number of agents and the starting agent
+  one byte per move: the index of the action in ACTIONS (the agent that
+      moved follows from the starting agent and the turn order)
+  END_OF_MOVES followed by the final score as a 4-byte signed integer
+
+Moves are written as the game is played.  capture.py closes the record
+even when the game raises, and readRecord accepts a record that ends early
+(no final score, a cut-off compressed stream): it returns the moves that
+reached the file.  Moves still buffered when a process is killed are lost.
+"""
+
+import os, struct, time
+from game import Directions
+
+MAGIC = b'PCR'
+VERSION = 1
+END_OF_MOVES = 0xFF
+ACTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.STOP]
+ACTION_CODES = dict([(action, i) for i, action in enumerate(ACTIONS)])
+
+COMPRESSIONS = ['none', 'gzip', 'lzma']
+EXTENSIONS = {'none': '.pcr', 'gzip': '.pcr.gz', 'lzma': '.pcr.xz'}
+
+def openRecordFile(path, mode, compression='none'):
+  if compression == 'gzip':
+    import gzip
+    return gzip.open(path, mode)
+  if compression == 'lzma':
+    import lzma
+    return lzma.open(path, mode)
+  return open(path, mode)
+
+def detectCompression(path):
+  with open(path, 'rb') as f:
+    start = f.read(6)
+  if start.startswith(b'\x1f\x8b'): return 'gzip'
+  if start.startswith(b'\xfd7zXZ\x00'): return 'lzma'
+  return 'none'
+
+def isRecordFile(path):
+  """
+  Returns true if path holds a record in this format (rather than, say, an
+  old pickled replay).
+  """
+  try:
+    with openRecordFile(path, 'rb', detectCompression(path)) as f:
+      return f.read(len(MAGIC)) == MAGIC
+  except (IOError, EOFError, OSError):
+    return False
+
+def uniqueRecordPath(prefix='replay', compression='none', directory='.'):
+  """
+  Creates (exclusively, so concurrent runs never clash) and returns a new
+  file name of the form prefix-YYYYmmdd-HHMMSS-pid-n.pcr.
+  """
+  stamp = time.strftime('%Y%m%d-%H%M%S')
+  n = 0
+  while True:
+    path = os.path.join(directory, '%s-%s-%d-%d%s' % (prefix, stamp, os.getpid(), n, EXTENSIONS[compression]))
+    try:
+      os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+      return path
+    except FileExistsError:
+      n += 1
+
+class GameRecorder:
+  """
+  Streams the moves of one game to a record file.  Game.run calls
+  recordMove after every move; close writes the final score.
+  """
+  def __init__(self, path, layout, numAgents, startingIndex, length,
+               seed=None, redTeamName='Red', blueTeamName='Blue', compression='none'):
+    self.path = path
+    self.numAgents = numAgents
+    self.nextAgent = startingIndex
+    header = {'fingerprint': layout.getFingerprint(),
+              'layout': layout.layoutText,
+              'seed': seed,
+              'length': length,
+              'redTeamName': redTeamName,
+              'blueTeamName': blueTeamName,
+              'numAgents': numAgents,
+              'startingIndex': startingIndex}
+    import json
+    headerBytes = json.dumps(header).encode('utf-8')
+    self.file = openRecordFile(path, 'wb', compression)
+    self.file.write(MAGIC + bytes([VERSION]) + struct.pack('<I', len(headerBytes)) + headerBytes)
+
+  def recordMove(self, agentIndex, action):
+    if agentIndex != self.nextAgent:
+      raise Exception('Moves must be recorded in turn order (expected agent %d, got %d)' % (self.nextAgent, agentIndex))
+    self.file.write(bytes([ACTION_CODES[action]]))
+    self.nextAgent = (agentIndex + 1) % self.numAgents
+
+  def close(self, score=None):
+    if self.file is None: return
+    if score is not None:
+      self.file.write(bytes([END_OF_MOVES]) + struct.pack('<i', int(score)))
+    self.file.close()
+    self.file = None
+
+def readAvailable(path, chunkSize=65536):
+  """
+  The (decompressed) bytes of a record file, up to where a truncated
+  compressed stream stops being readable.
+  """
+  import lzma, zlib
+  chunks = []
+  with openRecordFile(path, 'rb', detectCompression(path)) as f:
+    try:
+      while True:
+        chunk = f.read1(chunkSize) if hasattr(f, 'read1') else f.read(chunkSize)
+        if not chunk: break
+        chunks.append(chunk)
+    except (EOFError, lzma.LZMAError, zlib.error):
+      pass
+  return b''.join(chunks)
+
+def readRecord(path):
+  """
+  Returns (header, actions, finalScore) where actions is the list of
+  (agentIndex, action) pairs of the game.  finalScore is None if the game
+  was not finished or the record was cut off; actions then holds the moves
+  that were read.
+  """
+  import json
+  data = readAvailable(path)
+  if data[:len(MAGIC)] != MAGIC:
+    raise Exception('%s is not a game record' % path)
+  version = data[len(MAGIC)]
+  if version != VERSION:
+    raise Exception('Unsupported game record version %d in %s' % (version, path))
+  offset = len(MAGIC) + 1
+  headerLength, = struct.unpack_from('<I', data, offset)
+  offset += 4
+  header = json.loads(data[offset:offset + headerLength].decode('utf-8'))
+  offset += headerLength
+
+  actions = []
+  finalScore = None
+  agentIndex = header['startingIndex']
+  for position in range(offset, len(data)):
+    code = data[position]
+    if code == END_OF_MOVES:
+      if position + 5 <= len(data):
+        finalScore, = struct.unpack_from('<i', data, position + 1)
+      break
+    actions.append((agentIndex, ACTIONS[code]))
+    agentIndex = (agentIndex + 1) % header['numAgents']
+  return header, actions, finalScore
+
+def loadReplay(path):
+  """
+  Reads a record and returns the keyword arguments of capture.replayGame
+  (except display).
+  """
+  import layout, game
+  header, actions, finalScore = readRecord(path)
+  l = layout.Layout(header['layout'])
+  if l.getFingerprint() != header['fingerprint']:
+    raise Exception('The layout stored in %s does not match its fingerprint' % path)
+  return {'layout': l,
+          'agents': [game.Agent() for i in range(header['numAgents'])],
+          'actions': actions,
+          'length': header['length'],
+          'redTeamName': header['redTeamName'],
+          'blueTeamName': header['blueTeamName']}
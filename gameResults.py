@@ -0,0 +1,118 @@
+# gameResults.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Streaming per-game results.
+
+runGames hands every finished game to a ResultSink, which turns it into a
+small record (seed, layout, score, winner, number of moves and agent
+times), appends that record to a JSONL or CSV file straight away and
+updates the running totals.  The Game object itself can then be dropped.
+"""
+
+CSV_COLUMNS = ['game', 'seed', 'layout', 'redTeam', 'blueTeam', 'score', 'winner',
+               'moves', 'crashed', 'timeout', 'agentTimes']
+
+def winnerOf(score):
+    if score > 0: return 'Red'
+    if score < 0: return 'Blue'
+    return 'Tie'
+
+class ResultSink:
+    """
+    Receives finished games one at a time.  If path is given, records are
+    appended to it (CSV if it ends in .csv, JSON lines otherwise); without a
+    path only the aggregates are kept.
+    """
+    def __init__(self, path=None, redTeam='Red', blueTeam='Blue'):
+        self.path = path
+        self.redTeam = redTeam
+        self.blueTeam = blueTeam
+        self._file = None
+        self._csv = None
+
+        # Running aggregates
+        self.numGames = 0
+        self.totalScore = 0
+        self.redWins = 0
+        self.blueWins = 0
+        self.ties = 0
+        self.scores = []
+
+    def makeRecord(self, gameIndex, game, seed=None, layoutName=None):
+        score = game.state.data.score
+        return {'game': gameIndex,
+                'seed': seed,
+                'layout': layoutName,
+                'redTeam': self.redTeam,
+                'blueTeam': self.blueTeam,
+                'score': score,
+                'winner': winnerOf(score),
+                'moves': len(game.moveHistory),
+                'crashed': game.agentCrashed,
+                'timeout': game.agentTimeout,
+                'agentTimes': [round(t, 4) for t in game.timings.agentTotals(len(game.agents))]}
+
+    def addGame(self, gameIndex, game, seed=None, layoutName=None):
+        """
+        Records a finished game and returns its record.
+        """
+        record = self.makeRecord(gameIndex, game, seed, layoutName)
+        self.add(record)
+        return record
+
+    def add(self, record):
+        score = record['score']
+        self.numGames += 1
+        self.totalScore += score
+        self.scores.append(score)
+        if score > 0: self.redWins += 1
+        elif score < 0: self.blueWins += 1
+        else: self.ties += 1
+        if self.path:
+            self._write(record)
+
+    def _write(self, record):
+        if self._file is None:
+            self._file = open(self.path, 'a', newline='')
+            if self.path.endswith('.csv'):
+                import csv
+                self._csv = csv.DictWriter(self._file, CSV_COLUMNS)
+                if self._file.tell() == 0: self._csv.writeheader()
+        if self._csv is not None:
+            row = dict(record)
+            row['agentTimes'] = ' '.join([str(t) for t in record['agentTimes']])
+            self._csv.writerow(row)
+        else:
+            import json
+            self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._csv = None
+
+    def averageScore(self):
+        if self.numGames == 0: return 0.0
+        return self.totalScore / float(self.numGames)
+
+    def redWinRate(self):
+        if self.numGames == 0: return 0.0
+        return self.redWins / float(self.numGames)
+
+    def blueWinRate(self):
+        if self.numGames == 0: return 0.0
+        return self.blueWins / float(self.numGames)
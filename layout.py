@@ -12,17 +12,17 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
-from util import manhattanDistance
-from game import Grid
+from util import manhattanDistance, nearestPoint
+from game import Grid, Directions
 import os
 import random
-from functools import reduce
 
 VISIBILITY_MATRIX_CACHE = {}
 
 class Layout:
     """
-    A Layout manages the static information about the game board.
+    A Layout manages the static information about the game board.  It does
+    not change once built; the layouts getLayout returns are shared.
     """
 
     def __init__(self, layoutText):
@@ -36,31 +36,81 @@ class Layout:
         self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
-        # self.initializeVisibilityMatrix()
+        self._fingerprint = None
+        self._sightRanges = {}
+        # Built on first use (see getVisibilityMatrix)
+        self.visibility = None
 
     def getNumGhosts(self):
         return self.numGhosts
 
+    def getFingerprint(self):
+        """
+        A hex digest identifying the layout by its text.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = fingerprintText(self.layoutText)
+        return self._fingerprint
+
+    def getSightRanges(self, sightRange):
+        """
+        Maps every open cell to the frozenset of open cells within Manhattan
+        distance sightRange of it.  Computed once per layout and range.
+        """
+        if sightRange not in self._sightRanges:
+            walls = self.walls
+            ranges = {}
+            for x, y in walls.asList(False):
+                cells = []
+                for cx in range(max(0, x - sightRange), min(self.width, x + sightRange + 1)):
+                    reach = sightRange - abs(cx - x)
+                    for cy in range(max(0, y - reach), min(self.height, y + reach + 1)):
+                        if not walls[cx][cy]: cells.append((cx, cy))
+                ranges[(x, y)] = frozenset(cells)
+            self._sightRanges[sightRange] = ranges
+        return self._sightRanges[sightRange]
+
     def initializeVisibilityMatrix(self):
-        global VISIBILITY_MATRIX_CACHE
-        if reduce(str.__add__, self.layoutText) not in VISIBILITY_MATRIX_CACHE:
-            from game import Directions
-            vecs = [(-0.5,0), (0.5,0),(0,-0.5),(0,0.5)]
-            dirs = [Directions.NORTH, Directions.SOUTH, Directions.WEST, Directions.EAST]
-            vis = Grid(self.width, self.height, {Directions.NORTH:set(), Directions.SOUTH:set(), Directions.EAST:set(), Directions.WEST:set(), Directions.STOP:set()})
-            for x in range(self.width):
-                for y in range(self.height):
-                    if self.walls[x][y] == False:
-                        for vec, direction in zip(vecs, dirs):
-                            dx, dy = vec
-                            nextx, nexty = x + dx, y + dy
-                            while (nextx + nexty) != int(nextx) + int(nexty) or not self.walls[int(nextx)][int(nexty)] :
-                                vis[x][y][direction].add((nextx, nexty))
-                                nextx, nexty = x + dx, y + dy
-            self.visibility = vis
-            VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)] = vis
-        else:
-            self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)]
+        """
+        Sets self.visibility: for each direction, a list indexed by
+        x * height + y of bitsets (ints) of the cells seen looking that way
+        from (x, y) up to the first wall, where bit k - 1 stands for the k-th
+        cell along the ray.  Bits are relative to the cell so that bitsets
+        stay as short as the rays on large boards.  A ray is the ray of the
+        next cell over plus that cell, so each direction takes one pass over
+        the grid.  Layouts with the same fingerprint share the result.
+        """
+        fingerprint = self.getFingerprint()
+        if fingerprint not in VISIBILITY_MATRIX_CACHE:
+            from game import Actions
+            width, height, walls = self.width, self.height, self.walls.data
+            vis = {Directions.STOP: [0] * (width * height)}
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = [int(v) for v in Actions.directionToVector(direction)]
+                rays = [0] * (width * height)
+                # Visit every cell after its neighbor in this direction
+                xs, ys = list(range(width)), list(range(height))
+                if dx > 0: xs.reverse()
+                if dy > 0: ys.reverse()
+                for x in xs:
+                    nextx = x + dx
+                    if nextx < 0 or nextx >= width: continue
+                    for y in ys:
+                        nexty = y + dy
+                        if nexty < 0 or nexty >= height or walls[x][y] or walls[nextx][nexty]: continue
+                        rays[x * height + y] = (rays[nextx * height + nexty] << 1) | 1
+                vis[direction] = rays
+            VISIBILITY_MATRIX_CACHE[fingerprint] = vis
+        self.visibility = VISIBILITY_MATRIX_CACHE[fingerprint]
+
+    def getVisibilityMatrix(self):
+        """
+        self.visibility, built the first time it is needed: only the line of
+        sight queries below use it, so most games never pay for it.
+        """
+        if getattr(self, 'visibility', None) is None:
+            self.initializeVisibilityMatrix()
+        return self.visibility
 
     def isWall(self, pos):
         x, col = pos
@@ -85,7 +135,32 @@ class Layout:
 
     def isVisibleFrom(self, ghostPos, pacPos, pacDirection):
         row, col = [int(x) for x in pacPos]
-        return ghostPos in self.visibility[row][col][pacDirection]
+        x, y = nearestPoint(ghostPos)
+        if pacDirection in [Directions.NORTH, Directions.SOUTH]:
+            if x != row: return False
+            steps = (y - col) * (pacDirection == Directions.NORTH and 1 or -1)
+        elif pacDirection in [Directions.EAST, Directions.WEST]:
+            if y != col: return False
+            steps = (x - row) * (pacDirection == Directions.EAST and 1 or -1)
+        else:
+            return False
+        if steps <= 0: return False
+        return (self.getVisibilityMatrix()[pacDirection][row * self.height + col] >> (steps - 1)) & 1 == 1
+
+    def getVisibleCells(self, pos, direction):
+        """
+        The cells seen from pos looking in direction, nearest first.
+        """
+        from game import Actions
+        x, y = [int(v) for v in pos]
+        dx, dy = [int(v) for v in Actions.directionToVector(direction)]
+        bits = self.getVisibilityMatrix()[direction][x * self.height + y]
+        cells = []
+        while bits:
+            x, y = x + dx, y + dy
+            if bits & 1: cells.append((x, y))
+            bits >>= 1
+        return cells
 
     def __str__(self):
         return "\n".join(self.layoutText)
@@ -129,22 +204,81 @@ class Layout:
         elif layoutChar in  ['1', '2', '3', '4']:
             self.agentPositions.append( (int(layoutChar), (x,y)))
             self.numGhosts += 1
+def fingerprintText(layoutText):
+    import hashlib
+    return hashlib.sha1('\n'.join(layoutText).encode('utf-8')).hexdigest()
+
+# Directories getLayout looks in, resolved once per search depth
+SEARCH_PATHS = {}
+# Absolute file name -> Layout, so each file is parsed once per process
+LAYOUT_FILES = {}
+# Fingerprint -> Layout, so layouts with the same text are one shared object
+INTERNED_LAYOUTS = {}
+
+def getSearchPath(back = 2):
+    """
+    The directories getLayout tries, in order: the current directory and its
+    back + 1 nearest parents, each first through its layouts subdirectory.
+    Resolved on first use and never by changing the working directory, so it
+    is safe with concurrent games.
+    """
+    if back not in SEARCH_PATHS:
+        directory = os.path.abspath('.')
+        path = []
+        for level in range(back + 2):
+            path.append(os.path.join(directory, 'layouts'))
+            path.append(directory)
+            directory = os.path.dirname(directory)
+        SEARCH_PATHS[back] = path
+    return SEARCH_PATHS[back]
+
 def getLayout(name, back = 2):
-    if name.endswith('.lay'):
-        layout = tryToLoad('layouts/' + name)
-        if layout == None: layout = tryToLoad(name)
-    else:
-        layout = tryToLoad('layouts/' + name + '.lay')
-        if layout == None: layout = tryToLoad(name + '.lay')
-    if layout == None and back >= 0:
-        curdir = os.path.abspath('.')
-        os.chdir('..')
-        layout = getLayout(name, back -1)
-        os.chdir(curdir)
-    return layout
+    """
+    Finds a layout by name (with or without .lay) or path.  Layouts are
+    shared between callers and must not be modified.
+    """
+    if not name.endswith('.lay'): name += '.lay'
+    for directory in getSearchPath(back):
+        layout = tryToLoad(os.path.join(directory, name))
+        if layout != None: return layout
+    return None
 
 def tryToLoad(fullname):
+    fullname = os.path.abspath(fullname)
+    if fullname in LAYOUT_FILES: return LAYOUT_FILES[fullname]
     if(not os.path.exists(fullname)): return None
     f = open(fullname)
-    try: return Layout([line.strip() for line in f])
+    try: layoutText = [line.strip() for line in f]
     finally: f.close()
+    fingerprint = fingerprintText(layoutText)
+    layout = INTERNED_LAYOUTS.get(fingerprint)
+    if layout is None: layout = tryToLoadBundle(fullname, fingerprint)
+    if layout is None: layout = internLayout(layoutText)
+    LAYOUT_FILES[fullname] = layout
+    return layout
+
+def tryToLoadBundle(fullname, fingerprint):
+    """
+    The Layout from the compiled bundle next to a layout file (see
+    layoutBundle.py), or None if there is none or it was compiled from a
+    text with a different fingerprint.
+    """
+    import layoutBundle
+    path = layoutBundle.bundlePath(fullname)
+    if not os.path.exists(path): return None
+    layout = layoutBundle.loadLayout(path, fingerprint)
+    if layout is not None: INTERNED_LAYOUTS[fingerprint] = layout
+    return layout
+
+def internLayout(layoutText):
+    """
+    Returns the shared Layout for layoutText, parsing it only the first time
+    this text is seen.
+    """
+    fingerprint = fingerprintText(layoutText)
+    layout = INTERNED_LAYOUTS.get(fingerprint)
+    if layout is None:
+        layout = Layout(layoutText)
+        layout._fingerprint = fingerprint
+        INTERNED_LAYOUTS[fingerprint] = layout
+    return layout
@@ -0,0 +1,249 @@
+# layoutBundle.py
+# ---------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Compiled layouts.
+
+  python layoutBundle.py layouts/myCapture.lay [--distances]
+
+writes layouts/myCapture.layc next to the layout.  layout.getLayout uses
+the bundle instead of parsing the text when the bundle was compiled from
+the current text (same fingerprint), and recompiling is never required:
+a stale or unreadable bundle is ignored.
+
+A bundle file contains
+
+  MAGIC + one version byte
+  a 4-byte little-endian header length followed by a JSON header holding
+      the fingerprint of the source text, the board size and the offset and
+      length of every section
+  the sections, each starting at a multiple of 8 bytes:
+    text       the layout text (UTF-8, lines joined by newlines)
+    walls      bitmask of the walls, bit x * height + y
+    food       bitmask of the initial food
+    redSide    bitmask of the cells on the red side
+    capsules   int16 (x, y) pairs
+    agents     int16 (isPacman, x, y) triples, in the order of agentPositions
+    moves      one byte per cell: the legal moves (MOVE_BITS) from it
+    distances  (optional) uint16 maze distances between the open cells, in
+               the order of walls.asList(False); UNREACHABLE if none
+
+The file is memory mapped; the distance matrix is read in place.
+"""
+
+import mmap, os, struct, sys
+from game import Directions, Grid
+
+MAGIC = b'PLB'
+VERSION = 1
+EXTENSION = '.layc'
+UNREACHABLE = 0xFFFF
+MOVE_BITS = [(Directions.NORTH, 1, (0, 1)), (Directions.SOUTH, 2, (0, -1)),
+             (Directions.EAST, 4, (1, 0)), (Directions.WEST, 8, (-1, 0))]
+
+def bundlePath(layoutPath):
+  return os.path.splitext(layoutPath)[0] + EXTENSION
+
+def packMask(grid):
+  bits = ''.join([''.join([value and '1' or '0' for value in column]) for column in grid.data])
+  number = int(bits[::-1] or '0', 2)
+  return number.to_bytes((len(bits) + 7) // 8, 'little')
+
+def unpackMask(data, width, height):
+  number = int.from_bytes(data, 'little')
+  bits = bin(number)[2:][::-1].ljust(width * height, '0')
+  grid = Grid(width, height, False)
+  grid.data = [[bit == '1' for bit in bits[x * height:(x + 1) * height]] for x in range(width)]
+  return grid
+
+def compileLayout(layout, includeDistances=False):
+  """
+  Returns the bytes of the bundle for layout.
+  """
+  import json, array
+  width, height = layout.width, layout.height
+  redSide = Grid(width, height, False)
+  for x in range(width):
+    if x < width / 2: redSide.data[x] = [True] * height
+  walls = layout.walls
+  moves = bytearray(width * height)
+  for x in range(width):
+    for y in range(height):
+      if walls[x][y]: continue
+      for direction, bit, (dx, dy) in MOVE_BITS:
+        if 0 <= x + dx < width and 0 <= y + dy < height and not walls[x + dx][y + dy]:
+          moves[x * height + y] |= bit
+
+  sections = [('text', '\n'.join(layout.layoutText).encode('utf-8')),
+              ('walls', packMask(walls)),
+              ('food', packMask(layout.food)),
+              ('redSide', packMask(redSide)),
+              ('capsules', array.array('h', sum([list(c) for c in layout.capsules], [])).tobytes()),
+              ('agents', array.array('h', sum([[int(isPacman), x, y] for isPacman, (x, y) in layout.agentPositions], [])).tobytes()),
+              ('moves', bytes(moves))]
+  if includeDistances:
+    import distanceCalculator
+    cells, indices, neighbors = distanceCalculator.mazeGraph(layout)
+    matrix = array.array('H')
+    for source in range(len(cells)):
+      row = distanceCalculator.breadthFirstRow(neighbors, source)
+      matrix.extend([min(d, UNREACHABLE) for d in row])
+    if sys.byteorder != 'little': matrix.byteswap()
+    sections.append(('distances', matrix.tobytes()))
+
+  # Section offsets are relative to the first section
+  table = {}
+  offset = 0
+  for name, data in sections:
+    table[name] = [offset, len(data)]
+    offset += (len(data) + 7) // 8 * 8
+  header = json.dumps({'fingerprint': layout.getFingerprint(), 'width': width, 'height': height,
+                       'sections': table}).encode('utf-8')
+  start = len(MAGIC) + 1 + 4 + len(header)
+  start = (start + 7) // 8 * 8
+  out = bytearray(MAGIC + bytes([VERSION]) + struct.pack('<I', len(header)) + header)
+  out.extend(bytes(start - len(out)))
+  for name, data in sections:
+    out.extend(data)
+    out.extend(bytes((len(data) + 7) // 8 * 8 - len(data)))
+  return bytes(out)
+
+def writeBundle(layoutPath, includeDistances=False):
+  import layout
+  l = layout.Layout([line.strip() for line in open(layoutPath)])
+  path = bundlePath(layoutPath)
+  with open(path + '.tmp', 'wb') as f:
+    f.write(compileLayout(l, includeDistances))
+  os.replace(path + '.tmp', path)
+  return path
+
+class LayoutBundle:
+  """
+  A memory-mapped bundle file.
+  """
+  def __init__(self, path):
+    import json
+    with open(path, 'rb') as f:
+      self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(self.map)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+      raise Exception('%s is not a layout bundle' % path)
+    if view[len(MAGIC)] != VERSION:
+      raise Exception('Unsupported layout bundle version %d in %s' % (view[len(MAGIC)], path))
+    headerLength, = struct.unpack_from('<I', self.map, len(MAGIC) + 1)
+    headerStart = len(MAGIC) + 5
+    self.header = json.loads(bytes(view[headerStart:headerStart + headerLength]).decode('utf-8'))
+    self.start = (headerStart + headerLength + 7) // 8 * 8
+    self.view = view
+    self.width = self.header['width']
+    self.height = self.header['height']
+
+  def hasSection(self, name):
+    return name in self.header['sections']
+
+  def section(self, name):
+    offset, length = self.header['sections'][name]
+    if self.start + offset + length > len(self.view):
+      raise Exception('Layout bundle section %s is truncated' % name)
+    return self.view[self.start + offset:self.start + offset + length]
+
+  def mask(self, name):
+    return unpackMask(bytes(self.section(name)), self.width, self.height)
+
+  def pairs(self, name, size):
+    import array
+    values = array.array('h', bytes(self.section(name)))
+    return [tuple(values[i:i + size]) for i in range(0, len(values), size)]
+
+  def legalMoves(self, pos):
+    """
+    The directions an agent at pos can move in (STOP not included).
+    """
+    x, y = pos
+    bits = self.section('moves')[x * self.height + y]
+    return [direction for direction, bit, vector in MOVE_BITS if bits & bit]
+
+  def toLayout(self):
+    """
+    Builds the Layout without parsing its text.  The distance matrix, if
+    present, is registered with distanceCalculator for the layout's walls.
+    """
+    import layout
+    l = layout.Layout.__new__(layout.Layout)
+    l.width, l.height = self.width, self.height
+    l.layoutText = bytes(self.section('text')).decode('utf-8').split('\n')
+    l.walls = self.mask('walls')
+    l.food = self.mask('food')
+    l.capsules = self.pairs('capsules', 2)
+    l.agentPositions = [(isPacman == 1, (x, y)) for isPacman, x, y in self.pairs('agents', 3)]
+    l.numGhosts = len([p for p in l.agentPositions if not p[0]])
+    l.totalFood = l.food.count()
+    l._fingerprint = self.header['fingerprint']
+    l._sightRanges = {}
+    l.bundle = self
+    l.visibility = None
+    if self.hasSection('distances'):
+      import distanceCalculator
+      distanceCalculator.distanceMap[l.walls] = BundleDistances(l.walls.asList(False), self.section('distances').cast('H'))
+    return l
+
+class BundleDistances:
+  """
+  Maze distances read from a bundle's matrix, looked up like the table
+  distanceCalculator.computeDistances returns (distances[(pos1, pos2)]).
+  """
+  def __init__(self, cells, matrix):
+    self.cells = cells
+    self.indices = dict([(cell, i) for i, cell in enumerate(cells)])
+    self.matrix = matrix
+
+  def __contains__(self, key):
+    return key[0] in self.indices and key[1] in self.indices
+
+  def __getitem__(self, key):
+    distance = self.matrix[self.indices[key[0]] * len(self.cells) + self.indices[key[1]]]
+    if distance == UNREACHABLE: return sys.maxsize
+    return distance
+
+  def __len__(self):
+    return len(self.cells) ** 2
+
+  def __reduce__(self):
+    # Pickled (e.g. for a worker process) as a copy in memory
+    import array
+    return (BundleDistances, (self.cells, array.array('H', self.matrix)))
+
+def loadLayout(path, fingerprint):
+  """
+  The Layout in the bundle at path if it was compiled from a text with the
+  given fingerprint, otherwise None.
+  """
+  try:
+    bundle = LayoutBundle(path)
+    if bundle.header['fingerprint'] != fingerprint: return None
+    return bundle.toLayout()
+  except Exception:
+    # Truncated, corrupt or from an older format: parse the text instead
+    return None
+
+if __name__ == '__main__':
+  from optparse import OptionParser
+  parser = OptionParser('USAGE: python layoutBundle.py [--distances] LAYOUT.lay ...')
+  parser.add_option('-d', '--distances', action='store_true', default=False,
+                    help='Include the maze distance matrix')
+  options, args = parser.parse_args()
+  if not args: parser.error('expected layout files')
+  for layoutPath in args:
+    path = writeBundle(layoutPath, options.distances)
+    print('%s: %d bytes' % (path, os.path.getsize(path)))
@@ -41,10 +41,11 @@ E = ' '
 
 class Maze:
 
-  def __init__(self, rows, cols, anchor=(0, 0), root=None):
+  def __init__(self, rows, cols, anchor=(0, 0), root=None, rng=random):
     """
     generate an empty maze
     anchor is the top left corner of this grid's position in its parent grid
+    rng is the random generator of the whole maze (rooms use their root's)
     """
     self.r = rows
     self.c = cols
@@ -53,6 +54,8 @@ class Maze:
     self.rooms = []
     self.root = root
     if not self.root: self.root = self
+    if self.root is self: self.rng = rng
+    else: self.rng = self.root.rng
 
   def to_map(self):
     """
@@ -96,7 +99,7 @@ class Maze:
       if not self.root.c-1 in slots:
         if self.root.grid[max(slots)+1][add_c+i] == E: slots.remove(max(slots))
       if len(slots) <= gaps: return 0
-      random.shuffle(slots)
+      self.root.rng.shuffle(slots)
       for row in slots[int(round(gaps)):]:
         self.root.grid[row][add_c+i] = W
       self.rooms.append(Maze(self.r, i, (add_r,add_c), self.root))
@@ -110,7 +113,7 @@ class Maze:
       if not self.root.r-1 in slots:
         if self.root.grid[add_r+i][max(slots)+1] == E: slots.remove(max(slots))
       if len(slots) <= gaps: return 0
-      random.shuffle(slots)
+      self.root.rng.shuffle(slots)
       for col in slots[int(round(gaps)):]:
         self.root.grid[add_r+i][col] = W
       self.rooms.append(Maze(i, self.c, (add_r,add_c), self.root))
@@ -122,8 +125,9 @@ def make_with_prison(room, depth, gaps=1, vert=True, min_width=1, gapfactor=0.5)
   """
   Build a maze with 0,1,2 layers of prison (randomly)
   """
-  p = random.randint(0,2)
-  proll = random.random()
+  rng = room.root.rng
+  p = rng.randint(0,2)
+  proll = rng.random()
   if proll < 0.5:
     p = 1
   elif proll < 0.7:
@@ -135,7 +139,6 @@ def make_with_prison(room, depth, gaps=1, vert=True, min_width=1, gapfactor=0.5)
 
 
   add_r, add_c = room.anchor
-  print(p)
   for j in range(p):
     cur_col = 2*(j+1)-1
     for row in range(room.r):
@@ -172,7 +175,7 @@ def make(room, depth, gaps=1, vert=True, min_width=1, gapfactor=0.5):
   if depth==0: wall_slots = [num-2]  ## fix the first wall
   else: wall_slots = list(range(1, num-1))
   if len(wall_slots) == 0: return
-  choice = random.choice(wall_slots)
+  choice = room.root.rng.choice(wall_slots)
   if not room.add_wall(choice, gaps, vert): return
 
   ## recursively add walls
@@ -231,8 +234,8 @@ def add_pacman_stuff(maze, max_food=60, max_capsules=4, toskip=0):
   ## add capsules
   total_capsules = 0
   while total_capsules < max_capsules:
-    row = random.randint(1, maze.r-1)
-    col = random.randint(1+toskip, (maze.c//2)-2)
+    row = maze.rng.randint(1, maze.r-1)
+    col = maze.rng.randint(1+toskip, (maze.c//2)-2)
     if (row > maze.r-6) and (col < 6): continue
     if(abs(col - maze.c//2) < 3): continue
     if maze.grid[row][col] == E:
@@ -242,8 +245,8 @@ def add_pacman_stuff(maze, max_food=60, max_capsules=4, toskip=0):
 
   ## extra random food
   while total_food < max_food:
-    row = random.randint(1, maze.r-1)
-    col = random.randint(1+toskip, (maze.c//2)-1)
+    row = maze.rng.randint(1, maze.r-1)
+    col = maze.rng.randint(1+toskip, (maze.c//2)-1)
     if (row > maze.r-6) and (col < 6): continue
     if(abs(col - maze.c//2) < 3): continue
     if maze.grid[row][col] == E:
@@ -253,19 +256,138 @@ def add_pacman_stuff(maze, max_food=60, max_capsules=4, toskip=0):
 
 MAX_DIFFERENT_MAZES = 10000
 
-def generateMaze(seed = None):
-  if not seed:
+def generateMaze(seed = None, rows = 16, cols = 16):
+  """
+  The text of the maze for seed.  Uses a random generator of its own, so
+  the state of the random module is left alone (except for picking a seed
+  when none is given).
+
+  Each team's half is rows x cols, so the board (with its border) is
+  2 * cols + 2 wide and rows + 2 high; food grows with the area.
+  """
+  if seed is None:
     seed = random.randint(1,MAX_DIFFERENT_MAZES)
-  random.seed(seed)
-  maze = Maze(16,16)
-  gapfactor = min(0.65,random.gauss(0.5,0.1))
+  rng = random.Random(seed)
+  maze = Maze(rows,cols,rng=rng)
+  gapfactor = min(0.65,rng.gauss(0.5,0.1))
   skip = make_with_prison(maze, depth=0, gaps=3, vert=True, min_width=1, gapfactor=gapfactor)
   maze.to_map()
   add_pacman_stuff(maze, 2*(maze.r*maze.c//20), 4, skip)
   return str(maze)
 
-if __name__ == '__main__':
+#####################
+# Layout corpora    #
+#####################
+
+MANIFEST = 'manifest.json'
+
+def corpusFileName(seed):
+  return 'random%08dCapture.lay' % seed
+
+def writeCorpusMaze(job):
+  """
+  Generates the maze for one seed into directory and returns (seed, file
+  name, fingerprint).  Runs in a worker process.
+  """
+  import layout, os
+  directory, seed = job
+  text = generateMaze(seed)
+  name = corpusFileName(seed)
+  path = os.path.join(directory, name)
+  with open(path + '.tmp', 'w') as f:
+    f.write(text)
+  os.replace(path + '.tmp', path)
+  return seed, name, layout.fingerprintText(text.split('\n'))
+
+class MazeCorpus:
+  """
+  A directory of generated layouts plus a manifest mapping each seed to its
+  file and layout fingerprint, so that games can load mazes instead of
+  generating them (python capture.py --maze-corpus DIRECTORY).
+  """
+  def __init__(self, directory):
+    import json, os
+    self.directory = directory
+    self.entries = {}
+    path = os.path.join(directory, MANIFEST)
+    if os.path.exists(path):
+      with open(path) as f:
+        manifest = json.load(f)
+      for seed, entry in manifest['layouts'].items():
+        self.entries[int(seed)] = entry
+    self.seeds = sorted(self.entries.keys())
+
+  def __len__(self):
+    return len(self.entries)
+
+  def getLayoutText(self, seed):
+    """
+    The text of the maze for seed, or None if it is not in the corpus.
+    """
+    import os
+    entry = self.entries.get(seed)
+    if entry is None: return None
+    with open(os.path.join(self.directory, entry['file'])) as f:
+      return f.read()
+
+  def add(self, seeds, workers=None):
+    """
+    Generates the mazes for the seeds that are not in the corpus yet on a
+    pool of worker processes and rewrites the manifest.
+    """
+    import multiprocessing, os
+    if not os.path.isdir(self.directory): os.makedirs(self.directory)
+    jobs = [(self.directory, seed) for seed in seeds if seed not in self.entries]
+    if jobs:
+      pool = multiprocessing.Pool(workers)
+      try:
+        for seed, name, fingerprint in pool.imap_unordered(writeCorpusMaze, jobs, chunksize=16):
+          self.entries[seed] = {'file': name, 'fingerprint': fingerprint}
+      finally:
+        pool.close()
+        pool.join()
+      self.seeds = sorted(self.entries.keys())
+      self.writeManifest()
+    return len(jobs)
+
+  def writeManifest(self):
+    import json, os
+    path = os.path.join(self.directory, MANIFEST)
+    layouts = dict([(str(seed), self.entries[seed]) for seed in self.seeds])
+    with open(path + '.tmp', 'w') as f:
+      json.dump({'layouts': layouts}, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def readCommand(argv):
+  from optparse import OptionParser
+  usage = """
+  USAGE:      python mazeGenerator.py [--size WIDTHxHEIGHT] [seed]
+              python mazeGenerator.py --corpus DIRECTORY [-s FIRST] [-n COUNT] [-w WORKERS]
+
+  Prints the maze for seed (a random one if none is given), or adds the
+  mazes for seeds FIRST..FIRST+COUNT-1 to a layout corpus of standard size
+  mazes.  The size does not count the border: 32x16 is the standard board."""
+  parser = OptionParser(usage)
+  parser.add_option('--size', default='32x16', help='Board size of a printed maze [Default: %default]')
+  parser.add_option('-c', '--corpus', default=None, help='Corpus directory to generate mazes into')
+  parser.add_option('-s', '--start', type='int', default=1, help='First seed [Default: %default]')
+  parser.add_option('-n', '--count', type='int', default=1000, help='Number of mazes [Default: %default]')
+  parser.add_option('-w', '--workers', type='int', default=None, help='Worker processes [Default: CPU count]')
+  options, args = parser.parse_args(argv)
+  if len(args) > 1: parser.error('expected at most one seed')
   seed = None
-  if len(sys.argv) > 1:
-    seed = int(sys.argv[1])
-  print(generateMaze(seed))
+  if args: seed = int(args[0])
+  return seed, options
+
+if __name__ == '__main__':
+  seed, options = readCommand(sys.argv[1:])
+  if options.corpus is None:
+    width, height = [int(n) for n in options.size.split('x')]
+    print(generateMaze(seed, height, width // 2))
+  else:
+    import time
+    start = time.perf_counter()
+    corpus = MazeCorpus(options.corpus)
+    added = corpus.add(range(options.start, options.start + options.count), options.workers)
+    print('Generated %d mazes in %.2fs; %s now holds %d' % (added, time.perf_counter() - start,
+                                                         options.corpus, len(corpus)))
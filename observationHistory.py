@@ -0,0 +1,136 @@
+# observationHistory.py
+# ---------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Memory-bounded replacements for the list CaptureAgent keeps its past
+observations in.  Both classes support the parts of the list interface that
+agents use: append, len, indexing (including negative indices) and
+iteration.
+
+  RingObservationHistory(k)  keeps only the last k GameStates.
+  DeltaObservationHistory()  keeps the latest GameState in full and, for
+                             every older one, only its agent states, scalar
+                             fields and the food cells that changed since.
+                             Older states are rebuilt on demand.
+"""
+
+from collections import deque
+
+POLICIES = ['full', 'ring', 'delta']
+
+def makeObservationHistory(policy='full', length=None):
+  """
+  Returns an empty history for the given policy ('full' is a plain list).
+  """
+  if policy == 'full':
+    return []
+  if policy == 'ring':
+    if not length: raise Exception('The ring observation history needs a length')
+    return RingObservationHistory(length)
+  if policy == 'delta':
+    return DeltaObservationHistory()
+  raise Exception('Unknown observation history policy: ' + str(policy))
+
+class RingObservationHistory:
+  """
+  The last maxlen observations; older ones are discarded.
+  """
+  def __init__(self, maxlen):
+    self.states = deque(maxlen=maxlen)
+
+  def append(self, gameState):
+    self.states.append(gameState)
+
+  def clear(self):
+    self.states.clear()
+
+  def __len__(self):
+    return len(self.states)
+
+  def __getitem__(self, index):
+    return self.states[index]
+
+  def __iter__(self):
+    return iter(self.states)
+
+class DeltaObservationHistory:
+  """
+  Every observation of the game, stored as the latest full GameState plus a
+  compact record per earlier state.
+  """
+  def __init__(self):
+    self.latest = None
+    self.records = []   # one per state except the latest
+    self.toggles = []   # toggles[i]: food cells that differ between state i and i+1
+
+  def append(self, gameState):
+    if self.latest is not None:
+      self.records.append(snapshot(self.latest))
+      self.toggles.append(foodDifference(self.latest.data.food, gameState.data.food))
+    self.latest = gameState
+
+  def clear(self):
+    self.__init__()
+
+  def __len__(self):
+    if self.latest is None: return 0
+    return len(self.records) + 1
+
+  def __getitem__(self, index):
+    n = len(self)
+    if index < 0: index += n
+    if index < 0 or index >= n: raise IndexError('observation history index out of range')
+    if index == n - 1: return self.latest
+    return self.reconstruct(index)
+
+  def __iter__(self):
+    for i in range(len(self)):
+      yield self[i]
+
+  def reconstruct(self, index):
+    state = self.latest.deepCopy()
+    food = state.data.food
+    for i in range(len(self.toggles) - 1, index - 1, -1):
+      for x, y in self.toggles[i]:
+        food[x][y] = not food[x][y]
+    stateFields, dataFields = self.records[index]
+    state.__dict__.update(stateFields)
+    state.data.__dict__.update(dataFields)
+    state.data.agentStates = [a.copy() for a in dataFields['agentStates']]
+    state.data.capsules = dataFields['capsules'][:]
+    state.agentDistances = stateFields['agentDistances'][:]
+    return state
+
+def snapshot(gameState):
+  """
+  Everything about a GameState except its food grid and layout.
+  """
+  stateFields = dict(gameState.__dict__)
+  del stateFields['data']
+  stateFields['agentDistances'] = gameState.agentDistances[:]
+  dataFields = dict(gameState.data.__dict__)
+  del dataFields['food']
+  del dataFields['layout']
+  dataFields['agentStates'] = [a.copy() for a in gameState.data.agentStates]
+  dataFields['capsules'] = gameState.data.capsules[:]
+  return stateFields, dataFields
+
+def foodDifference(food, otherFood):
+  changed = []
+  for x in range(food.width):
+    column, otherColumn = food[x], otherFood[x]
+    if column != otherColumn:
+      for y in range(food.height):
+        if column[y] != otherColumn[y]: changed.append((x, y))
+  return changed
@@ -0,0 +1,271 @@
+# precomputation.py
+# -----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Per-layout analyses computed during registerInitialState.
+
+Every CaptureAgent has a Precomputations object, self.precomputed.  Agents
+register analyses on it (usually in __init__):
+
+  self.precomputed.register('foodClusters', self.computeFoodClusters, priority=5)
+
+where computeFoodClusters(gameState) returns any value; only values made of
+dicts, lists, tuples, strings and numbers can be cached on disk.  During
+registerInitialState the analyses run in order of decreasing priority until
+only CaptureAgent.startupReserve seconds of the startup budget are left.
+Results are exposed as attributes:
+
+  self.precomputed.foodClusters
+
+An analysis that did not fit into the startup budget is computed the first
+time it is used.  Results are kept for the rest of the process (shared by
+all agents and games on the same layout).  Agents that set
+CaptureAgent.precomputeCache also keep them on disk, as JSON files keyed by
+the analysis (its name and the function computing it) and the layout's
+fingerprint in a directory only the current user can write to
+(defaultCacheDir).  Analyses registered with cache=False never go to disk.
+"""
+
+import json, os, re, time, types
+
+# (name, variant, computeName, layout fingerprint) -> value, shared by all agents
+memoryCache = {}
+
+# Files kept in the disk cache; random layouts would otherwise fill it up
+MAX_CACHE_FILES = 200
+
+def defaultCacheDir():
+  """
+  The per-user cache directory: $XDG_CACHE_HOME/pacman-precomputed, by
+  default ~/.cache/pacman-precomputed.
+  """
+  base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+  return os.path.join(base, 'pacman-precomputed')
+
+def encode(value):
+  """
+  value as JSON-compatible data.  Dicts and tuples are tagged so that decode
+  can rebuild them with their (tuple) keys.  Raises TypeError for anything
+  else that JSON cannot hold.
+  """
+  if isinstance(value, dict):
+    return {'dict': [[encode(k), encode(v)] for k, v in value.items()]}
+  if isinstance(value, tuple):
+    return {'tuple': [encode(v) for v in value]}
+  if isinstance(value, list):
+    return [encode(v) for v in value]
+  if value is None or isinstance(value, (bool, int, float, str)):
+    return value
+  raise TypeError('Cannot cache %s values' % type(value).__name__)
+
+def decode(data):
+  if isinstance(data, dict):
+    if 'dict' in data: return dict([(decode(k), decode(v)) for k, v in data['dict']])
+    return tuple([decode(v) for v in data['tuple']])
+  if isinstance(data, list):
+    return [decode(v) for v in data]
+  return data
+
+def computeName(compute):
+  """
+  Tells analyses registered under the same name apart: the module and
+  qualified name of compute, and for a bound method also the class of its
+  object (a method inherited by several agent classes may call methods
+  they override).
+  """
+  name = '%s.%s' % (getattr(compute, '__module__', None),
+                    getattr(compute, '__qualname__', type(compute).__qualname__))
+  owner = getattr(compute, '__self__', None)
+  if owner is not None and not isinstance(owner, types.ModuleType):
+    name += '@%s.%s' % (type(owner).__module__, type(owner).__qualname__)
+  return name
+
+class Precomputations:
+  def __init__(self, cacheDir=None):
+    self.__dict__['tasks'] = {}
+    self.cacheDir = cacheDir
+    self.values = {}
+    self.sources = {}   # name -> 'memory', 'disk' or seconds spent computing
+    self.gameState = None
+    self.fingerprint = None
+
+  def register(self, name, compute, priority=0, cache=True, variant=''):
+    """
+    Registers compute(gameState) under name.  Analyses whose result depends
+    on more than the layout (the team, for instance) must pass a variant
+    string that tells the results apart in the caches.
+    """
+    self.tasks[name] = (priority, compute, cache, variant)
+
+  def bind(self, gameState):
+    """
+    Sets the initial state of the game the analyses are computed for.
+    """
+    self.gameState = gameState
+    self.fingerprint = gameState.data.layout.getFingerprint()
+    self.values = {}
+    self.sources = {}
+
+  def run(self, deadline):
+    """
+    Computes (or loads) registered analyses in order of decreasing priority
+    while time.monotonic() is before deadline.  An analysis is never
+    interrupted, so the last one started may run past the deadline.
+    """
+    order = sorted(self.tasks.keys(), key=lambda name: -self.tasks[name][0])
+    for name in order:
+      if time.monotonic() >= deadline: break
+      self.get(name)
+
+  def isReady(self, name):
+    return name in self.values
+
+  def get(self, name):
+    if name in self.values: return self.values[name]
+    if self.gameState is None:
+      raise Exception('Precomputation %s requested before registerInitialState' % name)
+    priority, compute, cache, variant = self.tasks[name]
+    key = (name, variant, computeName(compute), self.fingerprint)
+    if key in memoryCache:
+      value = memoryCache[key]
+      self.sources[name] = 'memory'
+    else:
+      value = None
+      if cache and self.cacheDir:
+        value = self.load(key)
+        if value is not None: self.sources[name] = 'disk'
+      if value is None:
+        start = time.monotonic()
+        value = compute(self.gameState)
+        self.sources[name] = time.monotonic() - start
+        if cache and self.cacheDir: self.save(key, value)
+      memoryCache[key] = value
+    self.values[name] = value
+    return value
+
+  def __getattr__(self, name):
+    # copy and pickle look up attributes before __init__ has set tasks
+    if name in self.__dict__.get('tasks', {}):
+      return self.get(name)
+    raise AttributeError(name)
+
+  def cachePath(self, key):
+    name, variant, function, fingerprint = key
+    if variant: name += '-' + variant
+    function = re.sub('[^A-Za-z0-9_.@-]', '_', function)
+    return os.path.join(self.cacheDir, '%s-%s-%s.json' % (name, function, fingerprint))
+
+  def load(self, key):
+    try:
+      with open(self.cachePath(key)) as f:
+        return decode(json.load(f))
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+      return None
+
+  def save(self, key, value):
+    """
+    Writes value atomically, so concurrent games never read half a file.
+    Failing to write the cache, or a value JSON cannot hold, is not an error.
+    """
+    path = self.cachePath(key)
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    try:
+      data = json.dumps(encode(value))
+      if not os.path.isdir(self.cacheDir): os.makedirs(self.cacheDir, 0o700)
+      with open(temporary, 'w') as f:
+        f.write(data)
+      os.replace(temporary, path)
+      self.prune()
+    except (IOError, OSError, TypeError, ValueError):
+      if os.path.exists(temporary): os.remove(temporary)
+
+  def prune(self):
+    """
+    Removes the least recently written files beyond MAX_CACHE_FILES.
+    """
+    paths = [os.path.join(self.cacheDir, f) for f in os.listdir(self.cacheDir) if f.endswith('.json')]
+    if len(paths) <= MAX_CACHE_FILES: return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:len(paths) - MAX_CACHE_FILES]:
+      try:
+        os.remove(path)
+      except OSError:
+        pass
+
+  def report(self):
+    """
+    One line per analysis: where its value came from and how long computing
+    it took.
+    """
+    lines = []
+    for name in sorted(self.tasks.keys(), key=lambda name: -self.tasks[name][0]):
+      source = self.sources.get(name)
+      if source is None: source = 'not computed'
+      elif not isinstance(source, str): source = 'computed in %.3fs' % source
+      else: source = 'from ' + source
+      lines.append('%-16s %s' % (name, source))
+    return '\n'.join(lines)
+
+##############################
+# Analyses CaptureAgents use #
+##############################
+
+def mazeDistances(gameState):
+  import distanceCalculator
+  walls = gameState.data.layout.walls
+  if walls in distanceCalculator.distanceMap:
+    return distanceCalculator.distanceMap[walls]
+  return distanceCalculator.computeDistances(gameState.data.layout)
+
+def deadEnds(gameState):
+  """
+  Maps every open cell inside a dead end (a part of the maze with only one
+  way out) to its distance from the exit of the dead end.  Cells on loops
+  are not included.  Agents that need it register it themselves:
+
+    self.precomputed.register('deadEnds', precomputation.deadEnds, priority=10)
+  """
+  walls = gameState.getWalls()
+  cells = set(walls.asList(False))
+  def neighbors(cell):
+    x, y = cell
+    return [n for n in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)] if n in cells]
+
+  # Peel cells with a single remaining neighbor until only loops are left
+  degree = dict([(cell, len(neighbors(cell))) for cell in cells])
+  removed = set()
+  stack = [cell for cell in cells if degree[cell] <= 1]
+  while stack:
+    cell = stack.pop()
+    if cell in removed: continue
+    removed.add(cell)
+    for n in neighbors(cell):
+      if n not in removed:
+        degree[n] -= 1
+        if degree[n] <= 1: stack.append(n)
+  if len(removed) == len(cells): return {}
+
+  # Depth: distance from the loop cells, walking only through dead ends
+  depths = {}
+  frontier = [cell for cell in removed if any([n not in removed for n in neighbors(cell)])]
+  for cell in frontier: depths[cell] = 1
+  while frontier:
+    nextFrontier = []
+    for cell in frontier:
+      for n in neighbors(cell):
+        if n in removed and n not in depths:
+          depths[n] = depths[cell] + 1
+          nextFrontier.append(n)
+    frontier = nextFrontier
+  return depths
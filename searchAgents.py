@@ -0,0 +1,557 @@
+# searchAgents.py
+# ---------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Adversarial search agents for the capture game.
+
+AlphaBetaCaptureAgent searches the four-agent turn order (teammates
+maximize, opponents minimize) with alpha-beta pruning, iterative deepening
+within the per-move deadline, a transposition table and history-heuristic
+move ordering.
+
+MCTSCaptureAgent runs Monte Carlo tree search with UCT selection and random
+rollouts on GameState.advance, keeping its (size-bounded) tree from one
+turn to the next.
+
+Subclasses of either normally only override evaluateState.  This file is
+also a team:
+
+  python capture.py -r searchAgents -b baseline --redOpts moveTime=0.3,debug=1
+  python capture.py -r searchAgents --redOpts first=MCTSCaptureAgent,second=MCTSCaptureAgent
+"""
+
+from captureAgents import CaptureAgent, TeamContext
+from collections import OrderedDict
+from game import Directions, Actions
+import math, random, time, util
+
+#################
+# Team creation #
+#################
+
+def createTeam(firstIndex, secondIndex, isRed,
+               first = 'AlphaBetaCaptureAgent', second = 'AlphaBetaCaptureAgent',
+               moveTime = None, debug = None, ponder = None, ponderTime = None):
+  """
+  moveTime caps the seconds searched per move (the game's own limit is
+  always respected); debug prints search statistics after every move;
+  ponder keeps MCTSCaptureAgents searching for up to ponderTime seconds
+  while the other agents move.
+  """
+  options = {}
+  if moveTime is not None: options['moveTime'] = float(moveTime)
+  if debug is not None: options['debug'] = debug not in ['0', 'False', 'false', False]
+  if ponder is not None: options['ponder'] = ponder not in ['0', 'False', 'false', False]
+  if ponderTime is not None: options['ponderTime'] = float(ponderTime)
+  agents = [eval(first)(firstIndex, **options), eval(second)(secondIndex, **options)]
+  TeamContext(isRed).addAgents(agents)
+  return agents
+
+#######################
+# Transposition Table #
+#######################
+
+# Kinds of bounds stored in the table
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+  """
+  Search results keyed by state.  At most maxSize entries are kept; once
+  full, the least recently used entry is replaced.
+  """
+  def __init__(self, maxSize=50000):
+    self.maxSize = maxSize
+    self.entries = OrderedDict()
+
+  def __len__(self):
+    return len(self.entries)
+
+  def get(self, key):
+    """
+    Returns (depth, value, bound, action) or None.
+    """
+    entry = self.entries.get(key)
+    if entry is not None:
+      self.entries.move_to_end(key)
+    return entry
+
+  def put(self, key, depth, value, bound, action):
+    entries = self.entries
+    entries[key] = (depth, value, bound, action)
+    entries.move_to_end(key)
+    if len(entries) > self.maxSize:
+      entries.popitem(last=False)
+
+  def clear(self):
+    self.entries.clear()
+
+##########
+# Agents #
+##########
+
+WIN_VALUE = 1000000
+
+class SearchCaptureAgent(CaptureAgent):
+  """
+  What the search agents below share: option handling, the turn order over
+  agents with known positions, the default evaluation and per-game search
+  statistics.  Subclasses implement search(gameState) and count the states
+  they visit in self.nodes.
+  """
+  def __init__(self, index, timeForComputing = .1, moveTime = None, debug = False,
+               ponder = None, ponderTime = None):
+    CaptureAgent.__init__(self, index, timeForComputing)
+    self.moveTime = moveTime
+    self.debug = debug
+    if ponder is not None: self.ponder = ponder
+    if ponderTime is not None: self.ponderTime = ponderTime
+    self.targetFood = []
+    self.nextAgent = {}
+    self.nodes = 0
+    self.totalNodes = 0
+    self.totalTime = 0.0
+
+  def registerInitialState(self, gameState):
+    CaptureAgent.registerInitialState(self, gameState)
+    self.team = set(self.getTeam(gameState))
+
+  def final(self, gameState):
+    if self.debug and self.totalTime > 0:
+      print('Agent %d searched %d nodes in %.1fs (%.0f nodes/s)' %
+            (self.index, self.totalNodes, self.totalTime, self.totalNodes / self.totalTime))
+    self.totalNodes = 0
+    self.totalTime = 0.0
+    CaptureAgent.final(self, gameState)
+
+  def evaluateState(self, gameState):
+    """
+    Heuristic value of gameState for this agent's team; override this.  The
+    default prefers a higher score, less food left to eat and being close to
+    the nearest piece of it.  It only looks at the cells that had food to eat
+    at the root (self.targetFood) rather than scanning the whole grid.
+    """
+    grid = gameState.data.food
+    food = [(x, y) for x, y in self.targetFood if grid[x][y]]
+    myPos = gameState.getAgentPosition(self.index)
+    value = 100 * self.getScore(gameState) - 10 * len(food)
+    if food and myPos is not None:
+      value -= min([self.getMazeDistance(myPos, f) for f in food])
+    return value
+
+  def chooseAction(self, gameState):
+    start = time.monotonic()
+    if self.moveTime is not None:
+      # timeRemaining keeps deadlineMargin in reserve, so add it back here
+      deadline = start + self.moveTime + self.deadlineMargin
+      if self.deadline is None or deadline < self.deadline: self.deadline = deadline
+
+    n = gameState.getNumAgents()
+    agents = [i for i in range(n) if gameState.getAgentPosition(i) is not None]
+    self.nextAgent = dict([(a, agents[(k + 1) % len(agents)]) for k, a in enumerate(agents)])
+    self.targetFood = self.getFood(gameState).asList()
+    self.nodes = 0
+
+    action = self.search(gameState)
+
+    elapsed = time.monotonic() - start
+    self.totalNodes += self.nodes
+    self.totalTime += elapsed
+    if self.debug:
+      print('Agent %d: %s, %s, %d nodes in %.3fs (%.0f nodes/s)' %
+            (self.index, action, self.searchSummary(), self.nodes, elapsed, self.nodes / max(elapsed, 1e-9)))
+    return action
+
+  def search(self, gameState):
+    """
+    Returns the action to take in gameState.
+    """
+    util.raiseNotDefined()
+
+  def searchSummary(self):
+    """
+    A short description of the last search for the debug output.
+    """
+    return ''
+
+class AlphaBetaCaptureAgent(SearchCaptureAgent):
+  """
+  Alpha-beta search over all agents whose positions are known.  One ply is
+  one agent's move, and iterativeDeepening searches one ply deeper each
+  iteration until the move deadline.
+  """
+  # Nodes searched between deadline checks
+  checkInterval = 256
+
+  def __init__(self, index, timeForComputing = .1, moveTime = None, debug = False, tableSize = 50000, **options):
+    SearchCaptureAgent.__init__(self, index, timeForComputing, moveTime, debug, **options)
+    self.table = TranspositionTable(tableSize)
+    self.history = util.Counter()
+    self.foodCodes = None
+    self.searchDepth = 0
+
+  def registerInitialState(self, gameState):
+    SearchCaptureAgent.registerInitialState(self, gameState)
+    # Zobrist codes: the food key of a state is the xor of the codes of its
+    # food cells, so eating or dropping food updates it in constant time.
+    # A private generator leaves the game's random stream untouched.
+    rng = random.Random(0)
+    walls = gameState.getWalls()
+    self.foodCodes = {}
+    for cell in walls.asList(False):
+      self.foodCodes[cell] = rng.getrandbits(64)
+
+  def final(self, gameState):
+    self.table.clear()
+    SearchCaptureAgent.final(self, gameState)
+
+  def search(self, gameState):
+    self.history = util.Counter()
+    self.searchDepth = 0
+    rootKey = 0
+    for cell in gameState.getRedFood().asList() + gameState.getBlueFood().asList():
+      rootKey ^= self.foodCodes[cell]
+    actions = self.orderActions(gameState, self.index, None)
+    return self.iterativeDeepening(lambda depth: self.searchRoot(gameState, rootKey, depth), actions[0])
+
+  def searchSummary(self):
+    return 'depth %d, %d table entries' % (self.searchDepth, len(self.table))
+
+  def searchRoot(self, gameState, foodKey, depth):
+    value, action = self.alphaBeta(gameState, foodKey, self.index, depth, -float('inf'), float('inf'))
+    self.searchDepth = depth
+    return action
+
+  def stateKey(self, gameState, foodKey, agentIndex):
+    """
+    Everything that affects the rest of the game except the time left.
+    """
+    data = gameState.data
+    agents = tuple([(a.configuration and a.configuration.pos, a.isPacman, a.scaredTimer, a.numCarrying)
+                    for a in data.agentStates])
+    return (foodKey, agentIndex, data.score, tuple(data.capsules), agents)
+
+  def childFoodKey(self, foodKey, child):
+    data = child.data
+    if data._foodEaten is not None:
+      foodKey ^= self.foodCodes[data._foodEaten]
+    if data._foodAdded:
+      for cell in data._foodAdded:
+        foodKey ^= self.foodCodes[cell]
+    return foodKey
+
+  def orderActions(self, gameState, agentIndex, firstAction):
+    """
+    The table's best action first, then by history score, with STOP last.
+    """
+    history = self.history
+    actions = gameState.getLegalActions(agentIndex)
+    actions.sort(key=lambda a: (a != firstAction, a == Directions.STOP, -history[(agentIndex, a)]))
+    return actions
+
+  def alphaBeta(self, gameState, foodKey, agentIndex, depth, alpha, beta):
+    """
+    Returns (value, bestAction) of gameState with agentIndex to move.
+    """
+    self.nodes += 1
+    if self.nodes % self.checkInterval == 0:
+      self.checkTime()
+
+    if gameState.isOver():
+      score = self.getScore(gameState)
+      if score == 0: return 0, None
+      return WIN_VALUE * util.sign(score), None
+    if depth == 0:
+      return self.evaluateState(gameState), None
+
+    key = self.stateKey(gameState, foodKey, agentIndex)
+    entry = self.table.get(key)
+    tableAction = None
+    if entry is not None:
+      entryDepth, value, bound, tableAction = entry
+      if entryDepth >= depth:
+        if bound == EXACT: return value, tableAction
+        if bound == LOWER: alpha = max(alpha, value)
+        else: beta = min(beta, value)
+        if alpha >= beta: return value, tableAction
+
+    originalAlpha, originalBeta = alpha, beta
+    maximizing = agentIndex in self.team
+    nextAgent = self.nextAgent[agentIndex]
+    bestValue = -float('inf') if maximizing else float('inf')
+    bestAction = None
+    for action in self.orderActions(gameState, agentIndex, tableAction):
+      child = gameState.generateSuccessor(agentIndex, action)
+      value, _ = self.alphaBeta(child, self.childFoodKey(foodKey, child), nextAgent, depth - 1, alpha, beta)
+      if maximizing:
+        if value > bestValue: bestValue, bestAction = value, action
+        alpha = max(alpha, value)
+      else:
+        if value < bestValue: bestValue, bestAction = value, action
+        beta = min(beta, value)
+      if alpha >= beta:
+        self.history[(agentIndex, action)] += depth * depth
+        break
+
+    if bestValue <= originalAlpha: bound = UPPER
+    elif bestValue >= originalBeta: bound = LOWER
+    else: bound = EXACT
+    self.table.put(key, depth, bestValue, bound, bestAction)
+    return bestValue, bestAction
+
+class MCTSNode:
+  """
+  A node of the MCTS tree.  Nodes store actions rather than states; the
+  state of a node is rebuilt by replaying the actions from the root.
+  value sums the rewards (from this agent's team's point of view) of the
+  simulations through the node.
+  """
+  __slots__ = ('agentIndex', 'parent', 'action', 'children', 'untried', 'visits', 'value')
+
+  def __init__(self, agentIndex, parent, action, untried):
+    self.agentIndex = agentIndex  # the agent to move in this node
+    self.parent = parent
+    self.action = action          # the action that led here from parent
+    self.children = []
+    self.untried = untried
+    self.visits = 0
+    self.value = 0.0
+
+def countNodes(node):
+  count = 0
+  stack = [node]
+  while stack:
+    node = stack.pop()
+    count += 1
+    stack.extend(node.children)
+  return count
+
+class MCTSCaptureAgent(SearchCaptureAgent):
+  """
+  Monte Carlo tree search with UCT selection.  Each iteration replays the
+  tree path on a private copy of the root state with GameState.advance,
+  expands one node and plays a random rollout of rolloutDepth plies, whose
+  result is scored by evaluateState.
+
+  The tree is kept between turns: the next search starts from the subtree
+  reached by this agent's move and the moves observed since.  The tree
+  stops growing at maxNodes nodes (later iterations only roll out from its
+  leaves).
+
+  With ponder set, the agent re-roots onto the state after its own move
+  and keeps running iterations there in the background while the other
+  agents move, so the next search starts with their replies explored.
+  """
+  # Exploration constant of UCT
+  exploration = 1.0
+  # Plies simulated after leaving the tree
+  rolloutDepth = 20
+  # Evaluation difference that maps to a reward of about 0.73
+  rewardScale = 10.0
+  # Iterations per move when the game sets no deadline
+  defaultIterations = 500
+
+  def __init__(self, index, timeForComputing = .1, moveTime = None, debug = False, maxNodes = 20000, **options):
+    SearchCaptureAgent.__init__(self, index, timeForComputing, moveTime, debug, **options)
+    self.maxNodes = maxNodes
+    self.root = None
+    self.rootState = None
+    self.numNodes = 0
+    self.iterations = 0
+    self.reusedVisits = 0
+    self.ponderIterations = 0
+    self.pondered = 0
+    # A private generator leaves the game's random stream untouched
+    self.rng = random.Random(index)
+
+  def final(self, gameState):
+    self.root = None
+    self.rootState = None
+    SearchCaptureAgent.final(self, gameState)
+
+  def search(self, gameState):
+    self.reroot(gameState)
+    self.rootValue = self.evaluateState(gameState)
+    self.iterations = 0
+    self.pondered, self.ponderIterations = self.ponderIterations, 0
+    if self.deadline is None:
+      for i in range(self.defaultIterations): self.runIteration()
+    else:
+      while not self.isTimeUp(): self.runIteration()
+
+    root = self.root
+    if not root.children:
+      self.lastAction = gameState.getLegalActions(self.index)[0]
+    else:
+      self.lastAction = max(root.children, key=lambda child: child.visits).action
+    return self.lastAction
+
+  def searchSummary(self):
+    summary = '%d iterations, %d tree nodes, %d visits reused' % (self.iterations, self.numNodes, self.reusedVisits)
+    if self.ponder: summary += ' (%d pondered)' % self.pondered
+    return summary
+
+  def startPondering(self, gameState, action):
+    if self.ponder: self.descend(gameState, action)
+    SearchCaptureAgent.startPondering(self, gameState, action)
+
+  def ponderStep(self):
+    if self.root is None or self.root.agentIndex == self.index: return False
+    self.runIteration()
+    self.ponderIterations += 1
+    return True
+
+  def descend(self, gameState, action):
+    """
+    Makes the child of the root for this agent's action the new root.
+    """
+    from capture import GameState
+    state = GameState(gameState)
+    child = self.followMove(self.root, state, action)
+    if child is None:
+      state.advance(self.index, action)
+      child = self.newNode(state, self.nextAgent[self.index], None, None)
+    child.parent = None
+    child.action = None
+    self.root = child
+    self.rootState = state
+    self.numNodes = countNodes(child)
+
+  def newNode(self, state, agentIndex, parent, action):
+    untried = state.getLegalActions(agentIndex)
+    self.rng.shuffle(untried)
+    self.numNodes += 1
+    return MCTSNode(agentIndex, parent, action, untried)
+
+  def signature(self, gameState):
+    data = gameState.data
+    return (tuple([gameState.getAgentPosition(i) for i in range(gameState.getNumAgents())]),
+            tuple([(a.isPacman, a.scaredTimer, a.numCarrying) for a in data.agentStates]),
+            data.score, tuple(data.capsules), data.food.count())
+
+  def reroot(self, gameState):
+    """
+    Makes the root the node for gameState: the subtree reached by the last
+    action and the moves the other agents made since, if it was explored,
+    or a new node.
+    """
+    from capture import GameState
+    node = self.root
+    if node is not None:
+      state = GameState(self.rootState)
+      if node.agentIndex == self.index:
+        node = self.followMove(node, state, self.lastAction)
+      while node is not None and node.agentIndex != self.index:
+        # Identify the other agent's move by where it ended up
+        agentIndex = node.agentIndex
+        observed = gameState.getAgentPosition(agentIndex)
+        move = None
+        for child in node.children:
+          trial = GameState(state)
+          trial.advance(agentIndex, child.action)
+          if trial.getAgentPosition(agentIndex) == observed:
+            move = child.action
+            break
+        node = self.followMove(node, state, move)
+      if node is not None and self.signature(state) != self.signature(gameState):
+        node = None
+
+    if node is None:
+      self.root = self.newNode(gameState, self.index, None, None)
+      self.numNodes = 1
+      self.reusedVisits = 0
+    else:
+      node.parent = None
+      node.action = None
+      self.root = node
+      self.numNodes = countNodes(node)
+      self.reusedVisits = node.visits
+    self.rootState = gameState
+
+  def followMove(self, node, state, action):
+    """
+    Returns the child of node reached by action, advancing state to it, or
+    None if that move was never expanded.
+    """
+    for child in node.children:
+      if child.action == action:
+        state.advance(node.agentIndex, action)
+        return child
+    return None
+
+  def selectChild(self, node):
+    logVisits = math.log(node.visits)
+    maximizing = node.agentIndex in self.team
+    exploration = self.exploration
+    best, bestScore = None, -float('inf')
+    for child in node.children:
+      mean = child.value / child.visits
+      if not maximizing: mean = 1 - mean
+      score = mean + exploration * math.sqrt(logVisits / child.visits)
+      if score > bestScore: best, bestScore = child, score
+    return best
+
+  def runIteration(self):
+    from capture import GameState
+    state = GameState(self.rootState)
+    node = self.root
+    # Selection
+    while not node.untried and node.children and not state.isOver():
+      node = self.selectChild(node)
+      state.advance(node.parent.agentIndex, node.action)
+      self.nodes += 1
+    # Expansion
+    if node.untried and not state.isOver() and self.numNodes < self.maxNodes:
+      action = node.untried.pop()
+      state.advance(node.agentIndex, action)
+      self.nodes += 1
+      child = self.newNode(state, self.nextAgent[node.agentIndex], node, action)
+      node.children.append(child)
+      node = child
+    # Simulation
+    reward = self.rollout(state, node.agentIndex)
+    # Backpropagation
+    while node is not None:
+      node.visits += 1
+      node.value += reward
+      node = node.parent
+    self.iterations += 1
+
+  def rolloutPolicy(self, state, agentIndex):
+    """
+    The action agentIndex takes in a rollout; a uniformly random legal move
+    other than STOP.  Override this for a heavier policy.
+    """
+    conf = state.data.agentStates[agentIndex].configuration
+    actions = Actions.getPossibleActions(conf, state.data.layout.walls)
+    if len(actions) > 1: actions.remove(Directions.STOP)
+    return self.rng.choice(actions)
+
+  def rollout(self, state, agentIndex):
+    """
+    Plays rolloutDepth plies on state (in place) and returns the reward in
+    [0, 1] for this agent's team.
+    """
+    nextAgent = self.nextAgent
+    plies = 0
+    while plies < self.rolloutDepth and not state.isOver():
+      state.advance(agentIndex, self.rolloutPolicy(state, agentIndex))
+      agentIndex = nextAgent[agentIndex]
+      plies += 1
+    self.nodes += plies
+    if state.isOver():
+      score = self.getScore(state)
+      if score > 0: return 1.0
+      if score < 0: return 0.0
+      return 0.5
+    return 1.0 / (1.0 + math.exp(-(self.evaluateState(state) - self.rootValue) / self.rewardScale))
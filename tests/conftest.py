@@ -0,0 +1,32 @@
+# conftest.py
+# -----------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+# The modules live in the repository root and import each other by name
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture
+def randomLayout():
+  import capture, layout
+  return layout.Layout(capture.randomLayout(5).split('\n'))
+
+@pytest.fixture
+def initialState(randomLayout):
+  import capture
+  state = capture.GameState()
+  state.initialize(randomLayout, 4)
+  state.data.timeleft = 1200
+  return state
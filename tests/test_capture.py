@@ -0,0 +1,34 @@
+# test_capture.py
+# ---------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+import capture
+from game import Directions
+
+def test_agent_distances_are_empty_when_fully_observable(monkeypatch, initialState):
+  monkeypatch.setattr(capture, 'PARTIAL_OBSERVABILITY', False)
+  assert initialState.getAgentDistances() == []
+  observation = initialState.makeObservation(0)
+  assert observation.getAgentDistances() == []
+  assert observation.generateSuccessor(0, Directions.STOP).getAgentDistances() == []
+
+def test_agent_distances_when_partially_observable(monkeypatch, initialState):
+  monkeypatch.setattr(capture, 'PARTIAL_OBSERVABILITY', True)
+  observation = initialState.makeObservation(0)
+  distances = observation.getAgentDistances()
+  assert len(distances) == initialState.getNumAgents()
+  position = initialState.getAgentPosition(0)
+  for i, distance in enumerate(distances):
+    trueDistance = abs(position[0] - initialState.getAgentPosition(i)[0]) + \
+                   abs(position[1] - initialState.getAgentPosition(i)[1])
+    assert distance - trueDistance in capture.SONAR_NOISE_VALUES
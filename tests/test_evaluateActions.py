@@ -0,0 +1,56 @@
+# test_evaluateActions.py
+# -----------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+import pytest
+import util
+
+numpy = pytest.importorskip('numpy')
+
+def registeredTeam(module, state, **options):
+  util.mutePrint()
+  try:
+    agents = module.createTeam(0, 2, True, **options)
+    for agent in agents: agent.registerInitialState(state)
+  finally:
+    util.unmutePrint()
+  return agents
+
+def test_approximateQ_evaluateActions_matches_evaluate(tmp_path, initialState):
+  import approximateQTeam
+  for agent in registeredTeam(approximateQTeam, initialState, weightsDir=str(tmp_path)):
+    actions = initialState.getLegalActions(agent.index)
+    expected = [agent.evaluate(initialState, action) for action in actions]
+    assert numpy.allclose(agent.evaluateActions(initialState, actions), expected)
+    counters = [agent.getFeatures(initialState, action) for action in actions]
+    assert numpy.allclose(agent.evaluateActions(initialState, actions, counters), expected)
+
+def test_approximateQ_chooses_through_evaluateActions(tmp_path, monkeypatch, initialState):
+  import approximateQTeam
+  from captureAgents import CaptureAgent
+  calls = []
+  evaluateActions = CaptureAgent.evaluateActions
+  def recordingEvaluateActions(self, gameState, actions, features=None):
+    calls.append(self.index)
+    return evaluateActions(self, gameState, actions, features)
+  monkeypatch.setattr(CaptureAgent, 'evaluateActions', recordingEvaluateActions)
+  for agent in registeredTeam(approximateQTeam, initialState, weightsDir=str(tmp_path)):
+    assert agent.chooseAction(initialState) in initialState.getLegalActions(agent.index)
+  assert calls == [0, 2]
+
+def test_evaluate_overrides_are_called_per_action(initialState):
+  import baseline
+  for agent in registeredTeam(baseline, initialState):
+    actions = initialState.getLegalActions(agent.index)
+    assert agent.evaluateActions(initialState, actions) == \
+      [agent.evaluate(initialState, action) for action in actions]
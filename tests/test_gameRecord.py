@@ -0,0 +1,74 @@
+# test_gameRecord.py
+# ------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+import random
+import pytest
+import gameRecord
+
+def writeRecord(path, layout, numMoves, compression, score=None):
+  rng = random.Random(1)
+  recorder = gameRecord.GameRecorder(str(path), layout, 4, 0, 1200, compression=compression)
+  moves = []
+  for i in range(numMoves):
+    action = gameRecord.ACTIONS[rng.randrange(len(gameRecord.ACTIONS))]
+    recorder.recordMove(i % 4, action)
+    moves.append((i % 4, action))
+  recorder.close(score)
+  return moves
+
+@pytest.mark.parametrize('compression', gameRecord.COMPRESSIONS)
+def test_round_trip(tmp_path, randomLayout, compression):
+  path = tmp_path / ('game' + gameRecord.EXTENSIONS[compression])
+  moves = writeRecord(path, randomLayout, 1000, compression, score=-3)
+  header, actions, finalScore = gameRecord.readRecord(str(path))
+  assert actions == moves
+  assert finalScore == -3
+  assert header['fingerprint'] == randomLayout.getFingerprint()
+
+@pytest.mark.parametrize('compression', gameRecord.COMPRESSIONS)
+def test_truncated_record_keeps_moves_read(tmp_path, randomLayout, compression):
+  path = tmp_path / ('game' + gameRecord.EXTENSIONS[compression])
+  moves = writeRecord(path, randomLayout, 20000, compression, score=5)
+  data = path.read_bytes()
+  path.write_bytes(data[:len(data) // 2])
+  header, actions, finalScore = gameRecord.readRecord(str(path))
+  assert finalScore is None
+  assert 0 < len(actions) < len(moves)
+  assert actions == moves[:len(actions)]
+
+def test_unfinished_record_has_no_score(tmp_path, randomLayout):
+  path = tmp_path / 'game.pcr'
+  moves = writeRecord(path, randomLayout, 10, 'none')
+  header, actions, finalScore = gameRecord.readRecord(str(path))
+  assert actions == moves
+  assert finalScore is None
+
+def test_runGames_closes_record_when_game_raises(tmp_path, monkeypatch, randomLayout):
+  import capture, game, textDisplay
+  from captureAgents import RandomAgent
+  monkeypatch.chdir(tmp_path)
+  def failingRun(self):
+    for turn in range(4):
+      self.recorder.recordMove((self.startingIndex + turn) % 4, game.Directions.STOP)
+    raise RuntimeError('agent bug')
+  monkeypatch.setattr(game.Game, 'run', failingRun)
+  agents = [RandomAgent(i) for i in range(4)]
+  with pytest.raises(RuntimeError):
+    capture.runGames([randomLayout], agents, textDisplay.NullGraphics(), 1200, 1, True, 0,
+                     'Red', 'Blue', resultSink=None)
+  paths = list(tmp_path.glob('replay-*.pcr'))
+  assert len(paths) == 1
+  header, actions, finalScore = gameRecord.readRecord(str(paths[0]))
+  assert len(actions) == 4
+  assert finalScore is None
@@ -0,0 +1,84 @@
+# test_precomputation.py
+# ----------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+import copy, pickle
+import pytest
+import baseline, precomputation, util
+
+@pytest.fixture(autouse=True)
+def emptyMemoryCache(monkeypatch):
+  monkeypatch.setattr(precomputation, 'memoryCache', {})
+
+def countFood(gameState):
+  return gameState.getRedFood().count()
+
+def countCapsules(gameState):
+  return len(gameState.getCapsules())
+
+@pytest.mark.parametrize('register', [False, True])
+def test_agents_survive_deepcopy_and_pickle(initialState, register):
+  agents = baseline.createTeam(0, 2, True)
+  if register:
+    util.mutePrint()
+    try:
+      for agent in agents: agent.registerInitialState(initialState)
+    finally:
+      util.unmutePrint()
+  for copies in [copy.deepcopy(agents), pickle.loads(pickle.dumps(agents))]:
+    assert [type(agent) for agent in copies] == [type(agent) for agent in agents]
+    assert copies[0].teamContext is copies[1].teamContext
+    assert 'mazeDistances' in copies[0].precomputed.tasks
+    if register:
+      assert copies[0].chooseAction(initialState) in initialState.getLegalActions(0)
+
+def test_missing_attributes_raise_AttributeError():
+  precomputed = precomputation.Precomputations()
+  with pytest.raises(AttributeError):
+    precomputed.foodCount
+  bare = precomputation.Precomputations.__new__(precomputation.Precomputations)
+  with pytest.raises(AttributeError):
+    bare.__deepcopy__
+  with pytest.raises(AttributeError):
+    bare.tasks
+
+def test_same_name_different_functions(initialState):
+  first = precomputation.Precomputations()
+  first.register('count', countFood)
+  second = precomputation.Precomputations()
+  second.register('count', countCapsules)
+  for precomputed in [first, second]: precomputed.bind(initialState)
+  assert first.count == initialState.getRedFood().count()
+  assert second.count == len(initialState.getCapsules())
+  assert second.sources['count'] != 'memory'
+
+def test_same_name_different_functions_on_disk(initialState, tmp_path, monkeypatch):
+  first = precomputation.Precomputations(str(tmp_path))
+  first.register('count', countFood)
+  first.bind(initialState)
+  assert first.count == initialState.getRedFood().count()
+
+  monkeypatch.setattr(precomputation, 'memoryCache', {})
+  second = precomputation.Precomputations(str(tmp_path))
+  second.register('count', countCapsules)
+  second.bind(initialState)
+  assert second.count == len(initialState.getCapsules())
+  assert second.sources['count'] != 'disk'
+  assert len(list(tmp_path.glob('count-*.json'))) == 2
+
+  monkeypatch.setattr(precomputation, 'memoryCache', {})
+  third = precomputation.Precomputations(str(tmp_path))
+  third.register('count', countFood)
+  third.bind(initialState)
+  assert third.count == initialState.getRedFood().count()
+  assert third.sources['count'] == 'disk'
@@ -0,0 +1,49 @@
+# test_successorCache.py
+# ----------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+import pytest
+import benchmarks, capture, util
+from captureAgents import CaptureAgent
+
+def playCounted(monkeypatch, team):
+  counts = [0]
+  generateSuccessor = capture.GameState.generateSuccessor
+  def countedSuccessor(self, agentIndex, action):
+    counts[0] += 1
+    return generateSuccessor(self, agentIndex, action)
+  monkeypatch.setattr(capture.GameState, 'generateSuccessor', countedSuccessor)
+  util.mutePrint()
+  try:
+    red = capture.loadAgents(True, team, True, {})
+    blue = capture.loadAgents(False, 'baseline.py', True, {})
+    agents = sum([list(pair) for pair in zip(red, blue)], [])
+    score, moves = benchmarks.playGame(benchmarks.loadLayout('RANDOM5'), agents, 1, 300, True)
+  finally:
+    util.unmutePrint()
+    monkeypatch.undo()
+  return score, moves, counts[0]
+
+@pytest.mark.parametrize('team', ['your_baseline3.py', '2015160321.py'])
+def test_cached_successors_play_the_same_game_with_fewer_successors(monkeypatch, team):
+  cached = playCounted(monkeypatch, team)
+  monkeypatch.setattr(CaptureAgent, 'getCachedSuccessor',
+                      lambda self, gameState, agentIndex, action: gameState.generateSuccessor(agentIndex, action))
+  uncached = playCounted(monkeypatch, team)
+  assert cached[:2] == uncached[:2]
+  assert cached[2] < uncached[2]
+
+def test_teams_use_the_shared_getSuccessor():
+  for team in ['baseline.py', 'your_baseline1.py', 'your_baseline2.py', 'your_baseline3.py', '2015160321.py']:
+    for agent in capture.loadAgents(True, team, True, {}):
+      assert type(agent).getSuccessor is CaptureAgent.getSuccessor
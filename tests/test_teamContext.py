@@ -0,0 +1,88 @@
+# test_teamContext.py
+# -------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+import baseline, util
+from captureAgents import TeamContext
+from game import Directions
+
+def redTeam(state):
+  util.mutePrint()
+  try:
+    agents = baseline.createTeam(0, 2, True)
+    for agent in agents: agent.registerInitialState(state)
+  finally:
+    util.unmutePrint()
+  return agents
+
+def test_perTurn_computes_once_per_observed_state(initialState):
+  context = TeamContext(True)
+  calls = []
+  def compute(gameState):
+    calls.append(gameState)
+    return len(calls)
+  assert context.perTurn(initialState, 'value', compute) == 1
+  assert context.perTurn(initialState, 'value', compute) == 1
+  nextState = initialState.generateSuccessor(0, Directions.STOP)
+  assert context.perTurn(nextState, 'value', compute) == 2
+  assert context.perTurn(nextState, 'value', compute) == 2
+  assert calls == [initialState, nextState]
+
+def test_teammates_share_the_turn_values(initialState):
+  first, second = redTeam(initialState)
+  assert first.teamContext is second.teamContext
+  food = first.teamContext.getFoodToEat(initialState)
+  assert food == set(initialState.getBlueFood().asList())
+  assert second.teamContext.getFoodToEat(initialState) is food
+
+def test_food_to_eat_follows_the_turn(initialState):
+  context = TeamContext(True)
+  food = context.getFoodToEat(initialState)
+  nextState = initialState.deepCopy()
+  eaten = sorted(food)[0]
+  nextState.data.food[eaten[0]][eaten[1]] = False
+  assert context.getFoodToEat(nextState) == food - set([eaten])
+
+def test_invaders(initialState):
+  context = TeamContext(True)
+  assert context.getInvaders(initialState) == []
+  invaded = initialState.deepCopy()
+  invaded.data.agentStates[1].isPacman = True
+  assert context.getInvaders(invaded) == [1]
+  assert TeamContext(False).getInvaders(invaded) == []
+
+def test_danger_map(initialState):
+  context = TeamContext(True)
+  danger = context.getDangerMap(initialState)
+  ghosts = [initialState.getAgentPosition(i) for i in initialState.getBlueTeamIndices()]
+  assert set(danger) == set(initialState.getWalls().asList(False))
+  for ghost in ghosts: assert danger[ghost] == 0
+  cell = initialState.getAgentPosition(0)
+  distancer = context.getDistancer(initialState)
+  assert danger[cell] == min([distancer.getDistance(cell, ghost) for ghost in ghosts])
+
+  scared = initialState.deepCopy()
+  for i in scared.getBlueTeamIndices(): scared.data.agentStates[i].scaredTimer = 40
+  assert context.getDangerMap(scared) == {}
+
+def test_intentions_are_shared_and_reset_each_game(initialState):
+  first, second = redTeam(initialState)
+  first.teamContext.setIntention(first.index, ('food', (3, 4)))
+  assert second.teamContext.getIntention(first.index) == ('food', (3, 4))
+  assert second.teamContext.getIntention(second.index) is None
+  util.mutePrint()
+  try:
+    first.registerInitialState(initialState)
+  finally:
+    util.unmutePrint()
+  assert second.teamContext.getIntention(first.index) is None
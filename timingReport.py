@@ -0,0 +1,126 @@
+# timingReport.py
+# ---------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Per-agent latency collection for games.
+
+Game.run records how long every call into an agent (and every successor
+the engine generates on its behalf) took in a TimingCollector.  At the end
+of a game the collector is reduced to a few summary statistics per agent
+and phase, which a TimingReport gathers across games and writes out as
+JSON or CSV.
+"""
+
+PHASES = ['registerInitialState', 'observationFunction', 'getAction', 'generateSuccessor']
+
+# Upper bounds (in seconds) of the latency histogram buckets; the last
+# bucket catches everything slower than the final bound.
+HISTOGRAM_BOUNDS = [0.001, 0.01, 0.1, 0.5, 1.0, 3.0]
+
+CSV_COLUMNS = ['game', 'agent', 'team', 'phase', 'count', 'total', 'mean',
+               'p50', 'p95', 'p99', 'max']
+
+def percentile(sortedValues, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sortedValues: return 0.0
+    rank = int(fraction * len(sortedValues) + 0.5)
+    rank = min(max(rank, 1), len(sortedValues))
+    return sortedValues[rank - 1]
+
+def histogram(values):
+    counts = [0 for bound in HISTOGRAM_BOUNDS] + [0]
+    for value in values:
+        bucket = 0
+        while bucket < len(HISTOGRAM_BOUNDS) and value > HISTOGRAM_BOUNDS[bucket]:
+            bucket += 1
+        counts[bucket] += 1
+    return counts
+
+class TimingCollector:
+    """
+    Raw per-call durations for one game, keyed by (agentIndex, phase).
+    """
+    def __init__(self):
+        self.samples = {}
+
+    def record(self, agentIndex, phase, seconds):
+        key = (agentIndex, phase)
+        if key not in self.samples:
+            self.samples[key] = []
+        self.samples[key].append(seconds)
+
+    def agentTotals(self, numAgents, phases=('observationFunction', 'getAction')):
+        """
+        Total time each agent spent in the given phases.
+        """
+        totals = [0.0 for i in range(numAgents)]
+        for (agentIndex, phase), values in self.samples.items():
+            if phase in phases: totals[agentIndex] += sum(values)
+        return totals
+
+    def summarize(self):
+        """
+        Returns one dict per (agent, phase) with count, total, mean,
+        p50/p95/p99/max and the latency histogram.
+        """
+        rows = []
+        for agentIndex, phase in sorted(self.samples, key=lambda k: (k[0], PHASES.index(k[1]))):
+            values = sorted(self.samples[(agentIndex, phase)])
+            total = sum(values)
+            rows.append({'agent': agentIndex,
+                         'phase': phase,
+                         'count': len(values),
+                         'total': total,
+                         'mean': total / len(values),
+                         'p50': percentile(values, 0.50),
+                         'p95': percentile(values, 0.95),
+                         'p99': percentile(values, 0.99),
+                         'max': values[-1],
+                         'histogram': histogram(values)})
+        return rows
+
+class TimingReport:
+    """
+    Collects the timing summaries of the games of one matchup.  Agents with
+    even indices belong to redTeam, odd ones to blueTeam.
+    """
+    def __init__(self, redTeam, blueTeam):
+        self.redTeam = redTeam
+        self.blueTeam = blueTeam
+        self.rows = []
+
+    def addGame(self, gameIndex, collector):
+        for row in collector.summarize():
+            row['game'] = gameIndex
+            row['team'] = [self.redTeam, self.blueTeam][row['agent'] % 2]
+            self.rows.append(row)
+
+def saveReports(reports, jsonPath=None, csvPath=None):
+    """
+    Writes the rows of several TimingReports to a JSON file and/or a CSV
+    file (the CSV omits the histograms).
+    """
+    rows = [row for report in reports for row in report.rows]
+    if jsonPath:
+        import json
+        with open(jsonPath, 'w') as f:
+            json.dump({'histogramBounds': HISTOGRAM_BOUNDS, 'rows': rows}, f, indent=1)
+    if csvPath:
+        import csv
+        with open(csvPath, 'w', newline='') as f:
+            writer = csv.DictWriter(f, CSV_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
@@ -13,7 +13,6 @@
 
 
 import sys
-import inspect
 import heapq, random
 import io
 
@@ -426,6 +425,7 @@ class Counter(dict):
         return addend
 
 def raiseNotDefined():
+    import inspect
     fileName = inspect.stack()[1][1]
     line = inspect.stack()[1][2]
     method = inspect.stack()[1][3]
@@ -586,7 +586,6 @@ def pause():
 # of active time outs.  Currently, questions which have test cases calling
 # this have all student code so wrapped.
 #
-import signal
 import time
 class TimeoutFunctionException(Exception):
     """Exception to raise on a timeout"""
@@ -605,6 +604,7 @@ class TimeoutFunction:
         # If we have SIGALRM signal, use it to cause an exception if and
         # when this function runs too long.  Otherwise check the time taken
         # after the method has returned, and throw an exception then.
+        import signal
         if hasattr(signal, 'SIGALRM'):
             old = signal.signal(signal.SIGALRM, self.handle_timeout)
             signal.alarm(self.timeout)